@@ -1,37 +1,180 @@
 import asyncio
 import base64
-import io
-import json
+import itertools
 import logging
 import os
 import random
-import string
+import secrets
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
 from pathlib import Path
 from datetime import datetime
 from typing import Any, Dict, List, Optional, Tuple
 
-from langchain.agents import AgentExecutor, create_openai_tools_agent
+import httpx
+import openai
+import orjson
 from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain.schema import HumanMessage, SystemMessage
 from langchain.tools import BaseTool
 from langchain_openai import ChatOpenAI
-from playwright.async_api import async_playwright, Browser, Page
-from PIL import Image
+from playwright.async_api import Browser, BrowserContext, Page
 from pydantic import BaseModel
 
-from data_service import JSONDataService
+from data_service import get_data_service
 from models import (
-    AICommandRequest,
-    AICommandResponse,
     MHMDPreference,
     MHMDWorkflowInput,
-    UserData,
-    UserResponse,
-    UserUpdateRequest,
+    ParsedCommand,
+    ParsedCommandBatch,
 )
 
 logger = logging.getLogger(__name__)
 
+# Model used for natural language command parsing
+PARSER_MODEL = "gpt-4o-mini"
+# Completion cap for parse calls; a full PARSE_BATCH_SIZE batch of arguments fits well within it
+PARSER_MAX_TOKENS = 512
+
+# OpenAI pacing: concurrent request cap plus requests/tokens per minute for the account tier
+OPENAI_MAX_CONCURRENCY = 20
+OPENAI_RPM = 500
+OPENAI_TPM = 90000
+
+# Parse micro-batching: commands arriving within the window share one OpenAI request
+PARSE_BATCH_SIZE = 8
+PARSE_BATCH_WINDOW = 0.02
+
+# Maximum number of parsed commands kept in the in-process LRU cache
+PARSE_CACHE_SIZE = 512
+# Punctuation trimmed from each word so "Opt me out." and "opt me out" share a cache entry
+CACHE_KEY_STRIP_CHARS = ".,!?;:'\"()"
+
+# Screenshots are captured as JPEG by Chromium at this quality
+SCREENSHOT_JPEG_QUALITY = 80
+
+# Lighter Chromium flags for server-side automation (less RSS, no background chatter)
+CHROMIUM_ARGS = [
+    "--disable-dev-shm-usage",
+    "--disable-gpu",
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-features=TranslateUI,BlinkGenPropertyTrees",
+]
+# The renderer sandbox stays on for arbitrary take_screenshot URLs; opt out only where it can't run (root in a container)
+if os.getenv("CHROMIUM_NO_SANDBOX", "").lower() in ("1", "true"):
+    CHROMIUM_ARGS.append("--no-sandbox")
+
+# Maximum number of warm pages kept open across the browser pool
+PAGE_POOL_SIZE = 4
+
+# Chromium processes launched at startup; pages are spread across them round-robin
+BROWSER_POOL_SIZE = min(2, os.cpu_count() or 1)
+
+# Backend API used by the swagger workflows; probed while the command is parsed
+BACKEND_URL = "http://localhost:8000"
+BACKEND_HEALTH_TIMEOUT = 2.0
+
+# Worker tasks draining the natural language command queue (one page each at a time)
+COMMAND_WORKERS = PAGE_POOL_SIZE
+
+# Artifact filenames share a process-start prefix (start second plus pid, so
+# uvicorn workers or a quick restart never overlap) and a sequence number, so
+# concurrent saves never collide and no per-save strftime is needed
+_START = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.getpid()}"
+_seq = itertools.count()
+
+# Verification files are compact unless PRETTY_VERIFICATION_JSON is set for debugging
+VERIFICATION_JSON_OPTIONS = orjson.OPT_INDENT_2 if os.getenv("PRETTY_VERIFICATION_JSON", "").lower() in ("1", "true") else None
+
+# Maximum number of structured events buffered per workflow run
+WORKFLOW_EVENT_LIMIT = 64
+
+# Preferences page selectors
+RADIO_SELECTOR = 'input[type="radio"][value="{}"]'
+NAME_INPUT_SELECTOR = 'input[type="text"]'
+EMAIL_INPUT_SELECTOR = 'input[type="email"]'
+SAVE_BUTTON_SELECTORS = 'button:has-text("Save Preferences"), button:has-text("Save"), input[type="submit"], button[type="submit"]'
+SUCCESS_MESSAGE_SELECTOR = '[data-testid="mhmd-success-banner"], .bg-green-50'
+SUCCESS_TEXT_SELECTOR = '[data-testid="mhmd-success-text"], .bg-green-50 .text-green-800'
+
+# Swagger UI selectors
+SWAGGER_UI_SELECTOR = '.swagger-ui'
+SWAGGER_GET_USER_SELECTOR = 'span:has-text("GET") + span:has-text("/api/user")'
+SWAGGER_RESPONSES_SELECTOR = '.responses-wrapper'
+# The live table only appears after Execute; the documented-responses table is there on expand
+SWAGGER_RESPONSE_STATUS_SELECTOR = '.live-responses-table .response-col_status'
+SWAGGER_RESPONSE_BODY_SELECTOR = '.live-responses-table .response-col_description pre'
+
+# Static system prompt for command parsing. Kept as a module-level constant so
+# every request sends the exact same prefix and benefits from OpenAI prompt caching.
+NL_PARSER_SYSTEM_MESSAGE = SystemMessage(content="""You are an expert at parsing natural language commands for a web automation tool that supports multiple workflows.
+
+Analyze the command and respond with ONLY a valid JSON object containing:
+- workflow_type: string ("mhmd_only", "swagger_only", or "combined")
+- name: string or null (user's name if specified, null if not)
+- email: string or null (user's email if specified, null if not specified or if random is requested)
+- preference: string or null (OPT_IN or OPT_OUT if specified, null if not)
+
+Workflow Detection Rules:
+- "mhmd_only": Commands about preferences, toggling MHMD, visiting preferences page, adding users WITHOUT API/Swagger testing
+- "swagger_only": Commands ONLY about API testing, Swagger UI, verifying existing users via API
+- "combined": Commands that explicitly mention BOTH creating/adding users AND testing/verifying via Swagger/API
+
+IMPORTANT: Only use "combined" or "swagger_only" if the command explicitly mentions API testing, Swagger UI, or API verification. Default to "mhmd_only" for simple user creation or preference changes.
+
+Examples:
+- "Visit preferences add John with random email and opt him in" -> {"workflow_type": "mhmd_only", "name": "John", "email": null, "preference": "OPT_IN"}
+- "Add user Sarah with email sarah@test.com and opt her out" -> {"workflow_type": "mhmd_only", "name": "Sarah", "email": "sarah@test.com", "preference": "OPT_OUT"}
+- "Test the API endpoint via Swagger UI" -> {"workflow_type": "swagger_only", "name": null, "email": null, "preference": null}
+- "Create test user and verify via swagger UI" -> {"workflow_type": "combined", "name": null, "email": null, "preference": null}
+- "Add John Doe with john@example.com and test via API" -> {"workflow_type": "combined", "name": "John Doe", "email": "john@example.com", "preference": null}
+- "Toggle preferences for Mike" -> {"workflow_type": "mhmd_only", "name": "Mike", "email": null, "preference": null}
+
+CRITICAL: Respond ONLY with valid JSON. No explanations, no markdown, no extra text.""")
+
+# Agent prompt template is immutable, so it is built once at import time
+AGENT_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", "You are a helpful assistant that executes web automation workflows."),
+    ("user", "{input}"),
+    MessagesPlaceholder(variable_name="agent_scratchpad"),
+])
+
+class TokenBucket:
+    """Proactively paces OpenAI calls against per-minute request and token budgets."""
+
+    def __init__(self, rpm: int, tpm: int):
+        self.rpm = rpm
+        self.tpm = tpm
+        self._requests = float(rpm)
+        self._tokens = float(tpm)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._updated = now
+        self._requests = min(self.rpm, self._requests + elapsed * self.rpm / 60)
+        self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm / 60)
+
+    async def acquire(self, tokens: int = 1):
+        """Wait until one request and the estimated tokens fit in the budget"""
+        tokens = min(tokens, self.tpm)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._requests >= 1 and self._tokens >= tokens:
+                    self._requests -= 1
+                    self._tokens -= tokens
+                    return
+                await asyncio.sleep(max(
+                    (1 - self._requests) * 60 / self.rpm,
+                    (tokens - self._tokens) * 60 / self.tpm
+                ))
+
 class MHMDWorkflowTool(BaseTool):
     name: str = "mhmd_workflow_tool"
     description: str = "Executes the MHMD preference workflow. Use this to toggle, opt-in, or opt-out a user. You can optionally provide a name and email. If an email is not provided but is required, a random one will be generated."
@@ -47,114 +190,251 @@ class MHMDWorkflowTool(BaseTool):
         return await self.service.execute_mhmd_toggle_workflow(workflow_input)
 
 class BrowserAutomationService:
-    def __init__(self, playwright, openai_api_key: str):
+    def __init__(self, playwright, openai_api_key: str, http_client: Optional[httpx.AsyncClient] = None):
         self.openai_api_key = openai_api_key
+        # One pooled HTTP/2 client shared by every chat model, so concurrent
+        # LLM calls reuse warm connections instead of paying new TLS handshakes.
+        # A client passed in by the caller stays owned (and closed) by the caller.
+        self._owns_openai_http_client = http_client is None
+        self._openai_http_client = http_client or httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=OPENAI_MAX_CONCURRENCY)
+        )
+        # Short-timeout client for the backend health probe
+        self._backend_http_client = httpx.AsyncClient(timeout=BACKEND_HEALTH_TIMEOUT)
+        openai_async_client = openai.AsyncOpenAI(
+            api_key=openai_api_key,
+            http_client=self._openai_http_client
+        ).chat.completions
         self.llm = ChatOpenAI(
             model="gpt-4-1106-preview",  # GPT-4 Turbo
             api_key=openai_api_key,
-            temperature=0.1
+            temperature=0.1,
+            async_client=openai_async_client
         )
-        self.data_service = JSONDataService()
+        # Structured-output parser so the SDK returns a validated ParsedCommand.
+        # Field extraction doesn't need GPT-4 Turbo, so it runs on a smaller, faster model.
+        parser_chat = ChatOpenAI(
+            model=PARSER_MODEL,
+            api_key=openai_api_key,
+            temperature=0,
+            max_tokens=PARSER_MAX_TOKENS,
+            async_client=openai_async_client
+        )
+        self._parser_llm = parser_chat.with_structured_output(ParsedCommand, method="function_calling")
+        self._batch_parser_llm = parser_chat.with_structured_output(ParsedCommandBatch, method="function_calling")
+        # Pending (user_message, future) pairs drained by the batch worker
+        self._parse_queue: asyncio.Queue = asyncio.Queue()
+        self._parse_worker: Optional[asyncio.Task] = None
+        self._parse_batch_tasks: set = set()
+        # Concurrency cap and rate-limit pacing shared by all LLM calls
+        self._llm_sem = asyncio.Semaphore(OPENAI_MAX_CONCURRENCY)
+        self._bucket = TokenBucket(rpm=OPENAI_RPM, tpm=OPENAI_TPM)
+        # LRU cache of parsed commands keyed by the normalized command text
+        self._parse_cache: OrderedDict[str, ParsedCommand] = OrderedDict()
+        self.data_service = get_data_service()
         self.playwright = playwright
         self.browser: Optional[Browser] = None
+        self.browsers: List[Browser] = []
+        self._browser_cycle = None
+        # Idle pages, each in a fresh context that no workflow has used yet
+        self._page_pool: asyncio.Queue = asyncio.Queue()
+        self._page_semaphore = asyncio.Semaphore(PAGE_POOL_SIZE)
+        # Background tasks replacing released pages, kept referenced until they finish
+        self._page_refills: set = set()
+        # Screenshot/verification writes are queued and flushed by a background task
+        self._artifact_queue: asyncio.Queue = asyncio.Queue()
+        self._artifact_writer: Optional[asyncio.Task] = None
+        # Natural language commands are queued and served by a bounded worker pool
+        self._command_queue: asyncio.Queue = asyncio.Queue()
+        self._command_workers: List[asyncio.Task] = []
+        # Artifact directories, created once in initialize_browser
+        self._screenshots_dir = Path("automation_results/screenshots")
+        self._verifications_dir = Path("automation_results/verifications")
+        # Dedicated pool for blocking disk writes so they never stall the event loop
+        self._io_executor = ThreadPoolExecutor(max_workers=4)
         
         # Initialize the tool
         mhmd_tool = MHMDWorkflowTool(service=self)
         tools = [mhmd_tool]
         
-        # Create the agent
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", "You are a helpful assistant that executes web automation workflows."),
-            ("user", "{input}"),
-            MessagesPlaceholder(variable_name="agent_scratchpad"),
-        ])
-        agent = create_openai_tools_agent(self.llm, tools, prompt)
+        # Create the agent (agent imports deferred to keep module import cheap)
+        from langchain.agents import AgentExecutor, create_openai_tools_agent
+        agent = create_openai_tools_agent(self.llm, tools, AGENT_PROMPT)
         self.agent_executor = AgentExecutor(agent=agent, tools=tools, verbose=False)
         
     async def initialize_browser(self):
-        """Launches the browser."""
-        if not self.browser:
-            self.browser = await self.playwright.chromium.launch(headless=True)
-        logger.info("Browser initialized.")
+        """Launches the browser pool used by the page pool and starts the command workers."""
+        if not self.browsers:
+            self.browsers = list(await asyncio.gather(*(
+                self.playwright.chromium.launch(headless=True, args=CHROMIUM_ARGS)
+                for _ in range(BROWSER_POOL_SIZE)
+            )))
+            self._browser_cycle = itertools.cycle(self.browsers)
+            # Primary browser, used for health checks and ad-hoc pages
+            self.browser = self.browsers[0]
+        if not self._command_workers:
+            self._command_workers = [asyncio.create_task(self._command_worker()) for _ in range(COMMAND_WORKERS)]
+        self._screenshots_dir.mkdir(parents=True, exist_ok=True)
+        self._verifications_dir.mkdir(parents=True, exist_ok=True)
+        logger.info("Browser pool initialized with %d instance(s).", len(self.browsers))
 
     async def shutdown_browser(self):
-        """Closes the browser."""
-        if self.browser:
-            await self.browser.close()
+        """Closes the pooled pages, their contexts and every browser in the pool."""
+        if self._parse_worker:
+            self._parse_worker.cancel()
+            self._parse_worker = None
+        for worker in self._command_workers:
+            worker.cancel()
+        self._command_workers = []
+        if self._page_refills:
+            await asyncio.gather(*self._page_refills, return_exceptions=True)
+        while not self._page_pool.empty():
+            page = self._page_pool.get_nowait()
+            await page.context.close()
+        self._browser_cycle = None
+        for browser in self.browsers:
+            await browser.close()
+        self.browsers = []
+        self.browser = None
+        # Flush pending artifact writes before the I/O pool goes away
+        await self._artifact_queue.join()
+        if self._artifact_writer:
+            self._artifact_writer.cancel()
+            self._artifact_writer = None
+        if self._owns_openai_http_client:
+            await self._openai_http_client.aclose()
+        await self._backend_http_client.aclose()
+        self._io_executor.shutdown(wait=True)
         logger.info("Browser shut down.")
 
-    async def take_screenshot(self, page: Page) -> str:
-        """Take a screenshot and return base64 encoded image"""
+    async def _run_io(self, func, *args):
+        """Run a blocking file operation on the I/O thread pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._io_executor, func, *args)
+
+    async def _new_isolated_page(self) -> Tuple[BrowserContext, Page]:
+        """Open a page in its own context on the next browser in the pool"""
+        # next() never yields to the loop, so the cycle needs no lock
+        browser = next(self._browser_cycle)
+        context = await browser.new_context(viewport={"width": 1280, "height": 720})
+        return context, await context.new_page()
+
+    async def _acquire_page(self) -> Page:
+        """Take a warm page from the pool, creating one lazily up to PAGE_POOL_SIZE"""
+        await self._page_semaphore.acquire()
+        try:
+            while not self._page_pool.empty():
+                page = self._page_pool.get_nowait()
+                if not page.is_closed():
+                    return page
+            _, page = await self._new_isolated_page()
+            return page
+        except BaseException:
+            # Includes CancelledError, so a cancelled borrower never keeps its permit
+            self._page_semaphore.release()
+            raise
+
+    async def _release_page(self, page: Page):
+        """Return the permit now and replace the page's context in the background, off the caller's latency"""
+        self._page_semaphore.release()
+        refill = asyncio.create_task(self._replace_pooled_page(page))
+        self._page_refills.add(refill)
+        refill.add_done_callback(self._page_refills.discard)
+
+    async def _replace_pooled_page(self, page: Page):
+        """Close a released page's context and pool a fresh one, so no storage or permissions carry over"""
+        try:
+            await page.context.close()
+            if self._page_pool.qsize() >= PAGE_POOL_SIZE:
+                return
+            _, fresh_page = await self._new_isolated_page()
+            self._page_pool.put_nowait(fresh_page)
+        except Exception as e:
+            logger.warning("Could not replace pooled page: %s", e)
+
+    @asynccontextmanager
+    async def pooled_page(self):
+        """Borrow a warm page from the pool for the duration of the block"""
+        page = await self._acquire_page()
+        try:
+            yield page
+        finally:
+            await self._release_page(page)
+
+    async def _screenshot_bytes(self, page: Page) -> bytes:
+        """Take a full-page JPEG screenshot and return the raw bytes"""
         if not page or page.is_closed():
             raise Exception("Page not available or closed")
         
-        screenshot_bytes = await page.screenshot(full_page=True)
+        return await page.screenshot(full_page=True, type="jpeg", quality=SCREENSHOT_JPEG_QUALITY)
+
+    async def take_screenshot(self, page: Page) -> str:
+        """Take a screenshot and return base64 encoded image"""
+        screenshot_bytes = await self._screenshot_bytes(page)
         return base64.b64encode(screenshot_bytes).decode()
     
-    def _save_screenshot_to_file(self, screenshot_b64: str, workflow_type: str = "automation") -> str:
-        """Save base64 screenshot to a PNG file and return the file path"""
-        try:
-            # Create automation_results directory if it doesn't exist
-            screenshots_dir = Path("automation_results/screenshots")
-            screenshots_dir.mkdir(parents=True, exist_ok=True)
-            
-            # Generate timestamp-based filename
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"{workflow_type}_{timestamp}.png"
-            file_path = screenshots_dir / filename
-            
-            # Decode base64 and save as PNG
-            screenshot_bytes = base64.b64decode(screenshot_b64)
-            with open(file_path, "wb") as f:
-                f.write(screenshot_bytes)
-            
-            logger.info(f"Screenshot saved to: {file_path}")
-            return str(file_path)
-            
-        except Exception as e:
-            logger.error(f"Failed to save screenshot: {e}")
-            return ""
+    def _save_screenshot_to_file(self, screenshot_bytes: bytes, workflow_type: str = "automation") -> str:
+        """Queue raw JPEG screenshot bytes for writing to a file and return the file path"""
+        # Generate a unique filename from the start prefix and sequence
+        filename = f"{workflow_type}_{_START}_{next(_seq)}.jpg"
+        file_path = self._screenshots_dir / filename
+        self._enqueue_artifact(file_path, screenshot_bytes)
+        return str(file_path)
     
     def _save_verification_to_file(self, verification_data: Dict[str, Any], workflow_type: str = "automation") -> str:
-        """Save database verification results to a JSON file and return the file path"""
-        try:
-            # Create automation_results directory if it doesn't exist
-            verifications_dir = Path("automation_results/verifications")
-            verifications_dir.mkdir(parents=True, exist_ok=True)
-            
-            # Generate timestamp-based filename
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"{workflow_type}_verification_{timestamp}.json"
-            file_path = verifications_dir / filename
-            
-            # Add timestamp to verification data
-            verification_with_timestamp = {
-                "timestamp": timestamp,
-                "workflow_type": workflow_type,
-                "verification_data": verification_data
-            }
-            
-            # Save as JSON
-            with open(file_path, "w") as f:
-                json.dump(verification_with_timestamp, f, indent=2)
-            
-            logger.info(f"Verification data saved to: {file_path}")
-            return str(file_path)
-            
-        except Exception as e:
-            logger.error(f"Failed to save verification data: {e}")
-            return ""
+        """Queue database verification results for writing to a JSON file and return the file path"""
+        # Generate a unique filename from the start prefix and sequence
+        filename = f"{workflow_type}_verification_{_START}_{next(_seq)}.json"
+        file_path = self._verifications_dir / filename
+        
+        # Add timestamp to verification data
+        verification_with_timestamp = {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "workflow_type": workflow_type,
+            "verification_data": verification_data
+        }
+        
+        # Serialize now so later changes to the caller's data don't leak into the file
+        self._enqueue_artifact(file_path, orjson.dumps(verification_with_timestamp, option=VERIFICATION_JSON_OPTIONS))
+        return str(file_path)
+
+    def _enqueue_artifact(self, file_path: Path, data: bytes):
+        """Hand an artifact to the background writer, starting it on first use"""
+        if not self._artifact_writer or self._artifact_writer.done():
+            self._artifact_writer = asyncio.create_task(self._artifact_writer_loop())
+        self._artifact_queue.put_nowait((file_path, data))
+
+    async def _artifact_writer_loop(self):
+        """Write queued artifacts on the I/O pool, off the workflows' critical path"""
+        while True:
+            # Drain everything queued so far and write the batch concurrently
+            batch = [await self._artifact_queue.get()]
+            while not self._artifact_queue.empty():
+                batch.append(self._artifact_queue.get_nowait())
+            results = await asyncio.gather(
+                *(self._run_io(file_path.write_bytes, data) for file_path, data in batch),
+                return_exceptions=True
+            )
+            for (file_path, _), result in zip(batch, results):
+                if isinstance(result, Exception):
+                    logger.error("Failed to save artifact %s: %s", file_path, result)
+                else:
+                    logger.info("Artifact saved to: %s", file_path)
+                self._artifact_queue.task_done()
     
-    async def navigate_to_url(self, page: Page, url: str) -> Dict[str, Any]:
-        """Navigate to a specific URL"""
+    async def navigate_to_url(self, page: Page, url: str, wait_until: str = "domcontentloaded", *, include_title: bool = False) -> Dict[str, Any]:
+        """Navigate to a specific URL, fetching the page title only when requested"""
         try:
-            await page.goto(url, wait_until="networkidle")
-            return {
+            await page.goto(url, wait_until=wait_until)
+            result = {
                 "success": True,
                 "message": f"Successfully navigated to {url}",
-                "current_url": page.url,
-                "title": await page.title()
+                "current_url": page.url
             }
+            if include_title:
+                result["title"] = await page.title()
+            return result
         except Exception as e:
             return {
                 "success": False,
@@ -182,8 +462,7 @@ class BrowserAutomationService:
     async def toggle_radio_button(self, page: Page, value: str) -> Dict[str, Any]:
         """Toggle a radio button by value"""
         try:
-            radio_selector = f'input[type="radio"][value="{value}"]'
-            await page.click(radio_selector)
+            await page.click(RADIO_SELECTOR.format(value))
             return {
                 "success": True,
                 "message": f"Successfully selected radio button with value: {value}"
@@ -211,27 +490,18 @@ class BrowserAutomationService:
     async def click_save_button(self, page: Page) -> Dict[str, Any]:
         """Click the save button"""
         try:
-            # Try multiple possible save button selectors
-            save_selectors = [
-                'button:has-text("Save Preferences")',
-                'button:has-text("Save")',
-                'input[type="submit"]',
-                'button[type="submit"]'
-            ]
-            
-            for selector in save_selectors:
-                try:
-                    await page.click(selector, timeout=2000)
-                    return {
-                        "success": True,
-                        "message": "Successfully clicked save button"
-                    }
-                except:
-                    continue
+            # Race all possible save button selectors in a single locator
+            try:
+                await page.locator(SAVE_BUTTON_SELECTORS).first.click(timeout=5000)
+            except Exception:
+                return {
+                    "success": False,
+                    "message": "Could not find save button"
+                }
             
             return {
-                "success": False,
-                "message": "Could not find save button"
+                "success": True,
+                "message": "Successfully clicked save button"
             }
         except Exception as e:
             return {
@@ -243,8 +513,8 @@ class BrowserAutomationService:
         """Wait for success message to appear"""
         try:
             # Wait for success message
-            await page.wait_for_selector('.bg-green-50', timeout=5000)
-            success_text = await page.locator('.bg-green-50 .text-green-800').text_content()
+            await page.wait_for_selector(SUCCESS_MESSAGE_SELECTOR, timeout=5000)
+            success_text = await page.locator(SUCCESS_TEXT_SELECTOR).first.text_content()
             return {
                 "success": True,
                 "message": f"Success message appeared: {success_text}"
@@ -258,7 +528,8 @@ class BrowserAutomationService:
     async def get_current_mhmd_preference(self) -> Dict[str, Any]:
         """Get the current MHMD preference from the database"""
         try:
-            user_data = self.data_service.get_user_data()
+            # The data service only reparses the file when it has changed
+            user_data = await self._run_io(self.data_service.get_user_data)
             if user_data:
                 return {
                     "success": True,
@@ -282,7 +553,7 @@ class BrowserAutomationService:
     
     async def execute_combined_mhmd_swagger_workflow(self, workflow_input: Optional[MHMDWorkflowInput] = None, base_url_frontend: str = "http://localhost:3000", base_url_backend: str = "http://localhost:8000") -> Dict[str, Any]:
         """Execute combined workflow: create test user via MHMD preferences and verify via Swagger UI"""
-        combined_results = []
+        events: deque = deque(maxlen=WORKFLOW_EVENT_LIMIT)
         all_screenshots = []
         page = None
         
@@ -291,11 +562,11 @@ class BrowserAutomationService:
                 raise Exception("Browser not initialized or closed. Please ensure the service is running.")
 
             # Step 1: Execute MHMD workflow to create test user
-            combined_results.append("🔄 Starting MHMD workflow to create test user...")
+            events.append(("mhmd_workflow", "started", base_url_frontend))
             
             # Use provided workflow input or generate test user data
             if workflow_input is None:
-                random_id = ''.join(random.choices(string.ascii_lowercase + string.digits, k=6))
+                random_id = secrets.token_hex(3)
                 test_name = f"Test User {random_id}"
                 test_email = f"testuser_{random_id}@example.com"
                 test_preference = random.choice([MHMDPreference.OPT_IN, MHMDPreference.OPT_OUT])
@@ -308,11 +579,11 @@ class BrowserAutomationService:
             else:
                 # Use provided input, but ensure we have values for the workflow
                 if not workflow_input.name:
-                    random_id = ''.join(random.choices(string.ascii_lowercase + string.digits, k=6))
+                    random_id = secrets.token_hex(3)
                     workflow_input.name = f"Test User {random_id}"
                 
                 if not workflow_input.email:
-                    random_id = ''.join(random.choices(string.ascii_lowercase + string.digits, k=6))
+                    random_id = secrets.token_hex(3)
                     workflow_input.email = f"testuser_{random_id}@example.com"
                 
                 if not workflow_input.preference:
@@ -324,48 +595,48 @@ class BrowserAutomationService:
             test_name = workflow_input.name
             test_email = workflow_input.email
             test_preference = workflow_input.preference
-            combined_results.extend([f"📋 MHMD Workflow: {step}" for step in mhmd_result.get('workflow_steps', [])])
+            events.extend(("mhmd_workflow", "step", step) for step in mhmd_result.get('workflow_steps', []))
             
             # Capture MHMD screenshot
             if mhmd_result.get('screenshot'):
                 all_screenshots.append({
                     'type': 'mhmd_preferences',
                     'screenshot': mhmd_result['screenshot'],
+                    'file_path': mhmd_result.get('screenshot_file_path', ''),
                     'description': 'MHMD User Preferences Page'
                 })
-                combined_results.append("📸 MHMD preferences screenshot captured")
+                events.append(("mhmd_screenshot", "ok", "captured"))
 
             if not mhmd_result.get('success'):
                 raise Exception(f"MHMD workflow failed: {mhmd_result.get('message', 'Unknown error')}")
 
             # Step 2: Execute Swagger API test workflow (skip user creation since we already created one)
-            combined_results.append("🔄 Starting Swagger UI API test workflow...")
+            events.append(("swagger_workflow", "started", base_url_backend))
             
             swagger_result = await self.execute_swagger_ui_only_workflow(base_url_backend)
-            combined_results.extend([f"📋 Swagger Workflow: {step}" for step in swagger_result.get('workflow_steps', [])])
+            events.extend(("swagger_workflow", "step", step) for step in swagger_result.get('workflow_steps', []))
             
             # Capture Swagger screenshot
             if swagger_result.get('screenshot'):
                 all_screenshots.append({
                     'type': 'swagger_ui',
                     'screenshot': swagger_result['screenshot'],
+                    'file_path': swagger_result.get('screenshot_file_path', ''),
                     'description': 'Swagger UI API Response'
                 })
-                combined_results.append("📸 Swagger UI response screenshot captured")
+                events.append(("swagger_screenshot", "ok", "captured"))
 
             if not swagger_result.get('success'):
                 raise Exception(f"Swagger workflow failed: {swagger_result.get('message', 'Unknown error')}")
 
-            # Step 3: Save combined screenshots
+            # Step 3: Collect screenshot files already persisted by each workflow,
+            # instead of decoding and re-writing their base64 copies
             screenshot_files = []
-            for i, screenshot_data in enumerate(all_screenshots):
-                screenshot_file = self._save_screenshot_to_file(
-                    screenshot_data['screenshot'], 
-                    f"combined_workflow_{screenshot_data['type']}"
-                )
+            for screenshot_data in all_screenshots:
+                screenshot_file = screenshot_data['file_path']
                 if screenshot_file:
                     screenshot_files.append(screenshot_file)
-                    combined_results.append(f"💾 {screenshot_data['description']} saved to: {screenshot_file}")
+                    events.append(("screenshot_file", screenshot_data['type'], screenshot_file))
 
             # Step 4: Create combined verification data
             verification_data = {
@@ -375,20 +646,21 @@ class BrowserAutomationService:
                     "email": test_email,
                     "preference": test_preference.value
                 },
-                "mhmd_workflow_result": mhmd_result,
-                "swagger_workflow_result": swagger_result,
+                # Screenshots are persisted as separate files; keep only their paths here
+                "mhmd_workflow_result": self._without_screenshot(mhmd_result),
+                "swagger_workflow_result": self._without_screenshot(swagger_result),
                 "screenshots_captured": len(all_screenshots),
                 "screenshot_files": screenshot_files
             }
             
             verification_file = self._save_verification_to_file(verification_data, "combined_workflow")
             if verification_file:
-                combined_results.append(f"📄 Combined verification data saved to: {verification_file}")
+                events.append(("save_verification", "queued", verification_file))
 
             return {
                 "success": True,
                 "message": "Combined MHMD + Swagger workflow completed successfully",
-                "workflow_steps": combined_results,
+                "workflow_steps": self._format_workflow_steps(events),
                 "screenshots": all_screenshots,
                 "screenshot_files": screenshot_files,
                 "test_user_data": {
@@ -402,7 +674,7 @@ class BrowserAutomationService:
             }
 
         except Exception as e:
-            combined_results.append(f"❌ Combined workflow error: {str(e)}")
+            events.append(("error", "failed", str(e)))
             
             # Save error screenshots if available
             error_screenshots = []
@@ -414,14 +686,14 @@ class BrowserAutomationService:
                         'screenshot': error_screenshot,
                         'description': 'Error Screenshot'
                     })
-                    combined_results.append("📸 Error screenshot captured")
+                    events.append(("error_screenshot", "ok", "captured"))
                 except:
                     pass
             
             return {
                 "success": False,
                 "message": f"Combined workflow failed: {str(e)}",
-                "workflow_steps": combined_results,
+                "workflow_steps": self._format_workflow_steps(events),
                 "screenshots": error_screenshots,
                 "error": str(e)
             }
@@ -431,380 +703,281 @@ class BrowserAutomationService:
 
     async def execute_swagger_ui_only_workflow(self, base_url: str = "http://localhost:8000") -> Dict[str, Any]:
         """Execute only the Swagger UI testing part without creating a new test user"""
-        workflow_results = []
-        screenshot_b64 = None
-        page = None
-        try:
-            if not self.browser or not self.browser.is_connected():
-                raise Exception("Browser not initialized or closed. Please ensure the service is running.")
-
-            page = await self.browser.new_page()
-            await page.set_viewport_size({"width": 1280, "height": 720})
-
-            # Step 1: Navigate to Swagger UI docs (skip user creation)
-            swagger_url = f"{base_url}/docs"
-            await page.goto(swagger_url, wait_until="networkidle")
-            workflow_results.append(f"📍 Navigated to Swagger UI: {swagger_url}")
-
-            # Wait for Swagger UI to load
-            await page.wait_for_selector('.swagger-ui', timeout=10000)
-            workflow_results.append("🔄 Swagger UI loaded successfully")
-
-            # Step 2: Find and expand the GET /api/user endpoint
-            get_user_endpoint = page.locator('span:has-text("GET") + span:has-text("/api/user")')
-            await get_user_endpoint.first.click()
-            workflow_results.append("🔍 Expanded GET /api/user endpoint")
-            
-            await asyncio.sleep(1)
-
-            # Step 3: Click "Try it out" button
-            try_it_button = page.locator('button:has-text("Try it out")')
-            await try_it_button.first.click()
-            workflow_results.append("🎯 Clicked 'Try it out' button")
-            
-            await asyncio.sleep(1)
-
-            # Step 4: Click "Execute" button to test the API
-            execute_button = page.locator('button:has-text("Execute")')
-            await execute_button.first.click()
-            workflow_results.append("⚡ Executed GET /api/user API call")
-            
-            await asyncio.sleep(2)
-
-            # Step 5: Wait for and capture the response
-            response_section = page.locator('.responses-wrapper')
-            await response_section.wait_for(timeout=5000)
-            
-            # Check for successful response
-            response_code = await page.locator('.response .response-col_status').first.text_content()
-            workflow_results.append(f"📊 API Response Status: {response_code}")
-            
-            # Get response body
-            try:
-                response_body = await page.locator('.response-col_description pre').first.text_content()
-                workflow_results.append(f"📄 Response Body Preview: {response_body[:200]}...")
-            except:
-                workflow_results.append("📄 Response body captured (details in screenshot)")
-
-            # Step 6: Take screenshot of the complete workflow
-            screenshot_b64 = await self.take_screenshot(page)
-            workflow_results.append("📸 Screenshot captured of Swagger UI API test")
-
-            # Step 7: Verify the user data in database one more time
-            final_verification = await self.get_current_mhmd_preference()
-            workflow_results.append(f"🗄️ Final DB verification: {final_verification}")
-
-            # Step 8: Save screenshot to file
-            screenshot_file_path = ""
-            if screenshot_b64:
-                screenshot_file_path = self._save_screenshot_to_file(screenshot_b64, "swagger_ui_only")
-                if screenshot_file_path:
-                    workflow_results.append(f"💾 Screenshot saved to: {screenshot_file_path}")
-
-            # Step 9: Save verification data to file
-            verification_data = {
-                "api_response_status": response_code,
-                "database_verification": final_verification,
-                "workflow_success": True,
-                "note": "Swagger UI only workflow - no new user created"
-            }
-            verification_file_path = self._save_verification_to_file(verification_data, "swagger_ui_only")
-            if verification_file_path:
-                workflow_results.append(f"💾 Verification data saved to: {verification_file_path}")
-
-            return {
-                "success": True,
-                "message": "Swagger UI only workflow completed successfully",
-                "workflow_steps": workflow_results,
-                "screenshot": screenshot_b64,
-                "screenshot_file_path": screenshot_file_path,
-                "api_response_status": response_code,
-                "database_verification": final_verification,
-                "verification_file_path": verification_file_path
-            }
-
-        except Exception as e:
-            workflow_results.append(f"❌ Error: {str(e)}")
-            screenshot_file_path = ""
-            verification_file_path = ""
-            
-            if page and not page.is_closed():
-                try:
-                    screenshot_b64 = await self.take_screenshot(page)
-                    workflow_results.append("📸 Error screenshot captured")
-                    
-                    screenshot_file_path = self._save_screenshot_to_file(screenshot_b64, "swagger_ui_only_error")
-                    if screenshot_file_path:
-                        workflow_results.append(f"💾 Error screenshot saved to: {screenshot_file_path}")
-                        
-                except Exception as screen_e:
-                    workflow_results.append(f"📸 Screenshot failed on error: {screen_e}")
-            
-            # Save error verification data
-            error_verification = {
-                "success": False,
-                "error": str(e),
-                "workflow_steps": workflow_results
-            }
-            verification_file_path = self._save_verification_to_file(error_verification, "swagger_ui_only_error")
-            if verification_file_path:
-                workflow_results.append(f"💾 Error verification saved to: {verification_file_path}")
-            
-            return {
-                "success": False,
-                "message": f"Swagger UI only workflow failed: {str(e)}",
-                "workflow_steps": workflow_results,
-                "screenshot": screenshot_b64,
-                "screenshot_file_path": screenshot_file_path,
-                "verification_file_path": verification_file_path,
-                "error": str(e)
-            }
-        finally:
-            if page and not page.is_closed():
-                await page.close()
+        return await self._execute_swagger_workflow(base_url, create_test_user=False)
 
     async def execute_swagger_api_test_workflow(self, base_url: str = "http://localhost:8000") -> Dict[str, Any]:
         """Execute the Swagger UI API testing workflow: create test user and verify via Swagger UI"""
-        workflow_results = []
-        screenshot_b64 = None
+        return await self._execute_swagger_workflow(base_url, create_test_user=True)
+
+    async def _execute_swagger_workflow(self, base_url: str, create_test_user: bool) -> Dict[str, Any]:
+        """Shared Swagger UI workflow, optionally creating a test user via the API first"""
+        workflow_type = "swagger_api_test" if create_test_user else "swagger_ui_only"
+        workflow_label = "Swagger UI API test workflow" if create_test_user else "Swagger UI only workflow"
+        events: deque = deque(maxlen=WORKFLOW_EVENT_LIMIT)
+        screenshot_bytes = None
+        test_user_data = None
         page = None
         try:
             if not self.browser or not self.browser.is_connected():
                 raise Exception("Browser not initialized or closed. Please ensure the service is running.")
 
-            page = await self.browser.new_page()
-            await page.set_viewport_size({"width": 1280, "height": 720})
-
-            # Step 1: Create test user via API call
-            import aiohttp
-            async with aiohttp.ClientSession() as session:
-                async with session.post(f"{base_url}/api/user/test") as response:
-                    if response.status == 200:
-                        test_user_data = await response.json()
-                        workflow_results.append(f"✅ Test user created: {test_user_data['data']['name']} with {test_user_data['data']['mhmd_preference']} preference")
-                    else:
-                        raise Exception(f"Failed to create test user: HTTP {response.status}")
+            page = await self._acquire_page()
+
+            # Build the Swagger UI locators once for this run
+            get_user_endpoint = page.locator(SWAGGER_GET_USER_SELECTOR).first
+            try_it_button = page.get_by_role("button", name="Try it out", exact=True).first
+            execute_button = page.get_by_role("button", name="Execute", exact=True).first
+            response_status = page.locator(SWAGGER_RESPONSE_STATUS_SELECTOR).first
+
+            # Step 1: Create test user via API call (skipped for the UI-only variant)
+            if create_test_user:
+                # Goes through the page's browser context, sharing its cookies and connections
+                response = await page.request.post(f"{base_url}/api/user/test")
+                if response.ok:
+                    test_user_data = await response.json()
+                    events.append(("create_test_user", "ok", f"{test_user_data['data']['name']} ({test_user_data['data']['mhmd_preference']})"))
+                else:
+                    raise Exception(f"Failed to create test user: HTTP {response.status}")
 
             # Step 2: Navigate to Swagger UI docs
             swagger_url = f"{base_url}/docs"
-            await page.goto(swagger_url, wait_until="networkidle")
-            workflow_results.append(f"📍 Navigated to Swagger UI: {swagger_url}")
+            await page.goto(swagger_url, wait_until="domcontentloaded")
+            events.append(("navigate", "ok", swagger_url))
 
             # Wait for Swagger UI to load
-            await page.wait_for_selector('.swagger-ui', timeout=10000)
-            workflow_results.append("🔄 Swagger UI loaded successfully")
+            await page.wait_for_selector(SWAGGER_UI_SELECTOR, timeout=10000)
+            events.append(("swagger_ui", "ok", "loaded"))
 
             # Step 3: Find and expand the GET /api/user endpoint
-            get_user_endpoint = page.locator('span:has-text("GET") + span:has-text("/api/user")')
-            await get_user_endpoint.first.click()
-            workflow_results.append("🔍 Expanded GET /api/user endpoint")
-            
-            await asyncio.sleep(1)
+            await get_user_endpoint.click()
+            events.append(("expand_endpoint", "ok", "GET /api/user"))
 
             # Step 4: Click "Try it out" button
-            try_it_button = page.locator('button:has-text("Try it out")')
-            await try_it_button.first.click()
-            workflow_results.append("🎯 Clicked 'Try it out' button")
-            
-            await asyncio.sleep(1)
+            await try_it_button.wait_for(state="visible", timeout=5000)
+            await try_it_button.click()
+            events.append(("try_it_out", "ok", "clicked"))
 
             # Step 5: Click "Execute" button to test the API
-            execute_button = page.locator('button:has-text("Execute")')
-            await execute_button.first.click()
-            workflow_results.append("⚡ Executed GET /api/user API call")
+            await execute_button.wait_for(state="visible", timeout=5000)
+            await execute_button.click()
+            events.append(("execute", "ok", "GET /api/user"))
             
-            await asyncio.sleep(2)
+            await response_status.wait_for(timeout=10000)
 
             # Step 6: Wait for and capture the response
-            response_section = page.locator('.responses-wrapper')
-            await response_section.wait_for(timeout=5000)
+            await page.locator(SWAGGER_RESPONSES_SELECTOR).first.wait_for(timeout=5000)
             
             # Check for successful response
-            response_code = await page.locator('.response .response-col_status').first.text_content()
-            workflow_results.append(f"📊 API Response Status: {response_code}")
+            response_code = await response_status.text_content()
+            events.append(("response_status", "ok", response_code))
             
             # Get response body
             try:
-                response_body = await page.locator('.response-col_description pre').first.text_content()
-                workflow_results.append(f"📄 Response Body Preview: {response_body[:200]}...")
+                response_body = await page.locator(SWAGGER_RESPONSE_BODY_SELECTOR).first.text_content()
+                events.append(("response_body", "ok", response_body[:200]))
             except:
-                workflow_results.append("📄 Response body captured (details in screenshot)")
+                events.append(("response_body", "missing", "details in screenshot"))
 
             # Step 7: Take screenshot of the complete workflow
-            screenshot_b64 = await self.take_screenshot(page)
-            workflow_results.append("📸 Screenshot captured of Swagger UI API test")
+            screenshot_bytes = await self._screenshot_bytes(page)
+            events.append(("screenshot", "ok", "captured"))
 
             # Step 8: Verify the user data in database one more time
             final_verification = await self.get_current_mhmd_preference()
-            workflow_results.append(f"🗄️ Final DB verification: {final_verification}")
+            events.append(("db_verification", "ok" if final_verification.get("success") else "failed", final_verification))
 
             # Step 9: Save screenshot to file
             screenshot_file_path = ""
-            if screenshot_b64:
-                screenshot_file_path = self._save_screenshot_to_file(screenshot_b64, "swagger_api_test")
+            if screenshot_bytes:
+                screenshot_file_path = self._save_screenshot_to_file(screenshot_bytes, workflow_type)
                 if screenshot_file_path:
-                    workflow_results.append(f"💾 Screenshot saved to: {screenshot_file_path}")
+                    events.append(("save_screenshot", "queued", screenshot_file_path))
 
             # Step 10: Save verification data to file
             verification_data = {
-                "test_user_created": test_user_data,
                 "api_response_status": response_code,
                 "database_verification": final_verification,
                 "workflow_success": True
             }
-            verification_file_path = self._save_verification_to_file(verification_data, "swagger_api_test")
+            if create_test_user:
+                verification_data["test_user_created"] = test_user_data
+            else:
+                verification_data["note"] = "Swagger UI only workflow - no new user created"
+            verification_file_path = self._save_verification_to_file(verification_data, workflow_type)
             if verification_file_path:
-                workflow_results.append(f"💾 Verification data saved to: {verification_file_path}")
+                events.append(("save_verification", "queued", verification_file_path))
 
-            return {
+            result = {
                 "success": True,
-                "message": "Swagger UI API test workflow completed successfully",
-                "workflow_steps": workflow_results,
-                "screenshot": screenshot_b64,
+                "message": f"{workflow_label} completed successfully",
+                "workflow_steps": self._format_workflow_steps(events),
+                "screenshot": base64.b64encode(screenshot_bytes).decode() if screenshot_bytes else None,
                 "screenshot_file_path": screenshot_file_path,
-                "test_user_data": test_user_data,
                 "api_response_status": response_code,
                 "database_verification": final_verification,
                 "verification_file_path": verification_file_path
             }
+            if create_test_user:
+                result["test_user_data"] = test_user_data
+            return result
 
         except Exception as e:
-            workflow_results.append(f"❌ Error: {str(e)}")
-            screenshot_file_path = ""
-            verification_file_path = ""
-            
-            if page and not page.is_closed():
-                try:
-                    screenshot_b64 = await self.take_screenshot(page)
-                    workflow_results.append("📸 Error screenshot captured")
-                    
-                    screenshot_file_path = self._save_screenshot_to_file(screenshot_b64, "swagger_api_test_error")
-                    if screenshot_file_path:
-                        workflow_results.append(f"💾 Error screenshot saved to: {screenshot_file_path}")
-                        
-                except Exception as screen_e:
-                    workflow_results.append(f"📸 Screenshot failed on error: {screen_e}")
-            
-            # Save error verification data
-            error_verification = {
-                "success": False,
-                "error": str(e),
-                "workflow_steps": workflow_results
-            }
-            verification_file_path = self._save_verification_to_file(error_verification, "swagger_api_test_error")
-            if verification_file_path:
-                workflow_results.append(f"💾 Error verification saved to: {verification_file_path}")
+            events.append(("error", "failed", str(e)))
+            error_bytes, screenshot_file_path, verification_file_path, screenshot_error = await self._save_error_artifacts(
+                page, e, workflow_type, self._format_workflow_steps(events)
+            )
+            if error_bytes:
+                events.append(("save_error_screenshot", "queued", screenshot_file_path))
+            elif screenshot_error:
+                events.append(("error_screenshot", "failed", screenshot_error))
+            events.append(("save_error_verification", "queued", verification_file_path))
             
             return {
                 "success": False,
-                "message": f"Swagger UI API test workflow failed: {str(e)}",
-                "workflow_steps": workflow_results,
-                "screenshot": screenshot_b64,
+                "message": f"{workflow_label} failed: {str(e)}",
+                "workflow_steps": self._format_workflow_steps(events),
+                "screenshot": base64.b64encode(error_bytes).decode() if error_bytes else None,
                 "screenshot_file_path": screenshot_file_path,
                 "verification_file_path": verification_file_path,
                 "error": str(e)
             }
         finally:
-            if page and not page.is_closed():
-                await page.close()
+            if page:
+                await self._release_page(page)
     
+    async def _save_error_artifacts(self, page: Optional[Page], error: Exception, workflow_type: str, workflow_steps: List[str]) -> Tuple[Optional[bytes], str, str, Optional[str]]:
+        """Capture an error screenshot if the page is still open and queue it with the error verification record"""
+        screenshot_bytes = None
+        screenshot_file_path = ""
+        screenshot_error = None
+        if page and not page.is_closed():
+            try:
+                screenshot_bytes = await self._screenshot_bytes(page)
+                screenshot_file_path = self._save_screenshot_to_file(screenshot_bytes, f"{workflow_type}_error")
+            except Exception as screen_e:
+                screenshot_error = str(screen_e)
+
+        error_verification = {
+            "success": False,
+            "error": str(error),
+            "workflow_steps": workflow_steps
+        }
+        verification_file_path = self._save_verification_to_file(error_verification, f"{workflow_type}_error")
+        return screenshot_bytes, screenshot_file_path, verification_file_path, screenshot_error
+
+    @staticmethod
+    def _without_screenshot(result: Dict[str, Any]) -> Dict[str, Any]:
+        """Copy a workflow result without its inline base64 screenshot"""
+        return {key: value for key, value in result.items() if key != "screenshot"}
+
+    @staticmethod
+    def _format_workflow_steps(events) -> List[str]:
+        """Render buffered (step, status, detail) events into workflow step strings"""
+        return [f"{step} [{status}]: {detail}" for step, status, detail in events]
+
     async def execute_mhmd_toggle_workflow(self, workflow_input: MHMDWorkflowInput, base_url: str = "http://localhost:3000") -> Dict[str, Any]:
         """Execute the complete MHMD toggle workflow using dynamic inputs."""
-        workflow_results = []
+        events: deque = deque(maxlen=WORKFLOW_EVENT_LIMIT)
         screenshot_b64 = None
+        screenshot_bytes = None
         page = None
         try:
             if not self.browser or not self.browser.is_connected():
                 raise Exception("Browser not initialized or closed. Please ensure the service is running.")
 
-            page = await self.browser.new_page()
-            await page.set_viewport_size({"width": 1280, "height": 720})
+            page = await self._acquire_page()
 
-            # Navigate to the base URL
-            await page.goto(base_url, wait_until="networkidle")
-            workflow_results.append(f"📍 Navigated to: {base_url}")
+            # Build the form locators once for this run
+            name_input = page.locator(NAME_INPUT_SELECTOR).first
+            email_input = page.locator(EMAIL_INPUT_SELECTOR).first
+
+            # Navigate to the base URL and wait only for the link we need next
+            await page.goto(base_url, wait_until="domcontentloaded")
+            await page.get_by_text("Preferences").first.wait_for(state="visible", timeout=5000)
+            events.append(("navigate", "ok", base_url))
 
             # Step 2: Find and click Preferences link
             prefs_result = await self.find_and_click_element(page, None, "Preferences")
-            workflow_results.append(f"🔗 Preferences click: {prefs_result['message']}")
+            events.append(("preferences_click", "ok" if prefs_result['success'] else "failed", prefs_result['message']))
             if not prefs_result['success']:
                 raise Exception("Failed to click Preferences link")
 
-            await asyncio.sleep(2)
+            # The preferences form is ready once its name input is visible
+            await name_input.wait_for(state="visible", timeout=5000)
 
             # Step 3: Determine target preference
             if workflow_input.preference:
                 new_pref = workflow_input.preference.value
-                workflow_results.append(f"🎯 Target preference specified: {new_pref}")
+                events.append(("target_preference", "specified", new_pref))
             else:
                 current_pref_result = await self.get_current_mhmd_preference()
                 current_pref = current_pref_result.get('current_preference', 'OPT_OUT')
                 new_pref = "OPT_IN" if current_pref == "OPT_OUT" else "OPT_OUT"
-                workflow_results.append(f"🔄 No preference specified, toggling to: {new_pref}")
+                events.append(("target_preference", "toggled", new_pref))
 
             # Step 4: Toggle MHMD preference
             toggle_result = await self.toggle_radio_button(page, new_pref)
-            workflow_results.append(f"🎛️ Toggle result: {toggle_result['message']}")
+            events.append(("toggle", "ok" if toggle_result['success'] else "failed", toggle_result['message']))
             if not toggle_result['success']:
                 raise Exception("Failed to toggle MHMD preference")
 
             # Step 5: Fill in required fields
             try:
                 user_name = workflow_input.name or "Test User"
-                await self.fill_input_field(page, 'input[type="text"]', user_name)
-                workflow_results.append(f"📝 Filled name field with: {user_name}")
-
                 user_email = workflow_input.email
                 if not user_email or user_email == 'random':
-                    user_email = f"testuser_{''.join(random.choices(string.ascii_lowercase + string.digits, k=6))}@example.com"
-                    workflow_results.append(f"📧 Generated random email: {user_email}")
-                
-                await self.fill_input_field(page, 'input[type="email"]', user_email)
-                workflow_results.append(f"📧 Filled email field with: {user_email}")
+                    user_email = f"testuser_{secrets.token_hex(3)}@example.com"
+                    events.append(("generate_email", "ok", user_email))
+
+                # fill() types into the focused element, so the inputs must be filled one at a time
+                for event, locator, value in (
+                    ("fill_name", name_input, user_name),
+                    ("fill_email", email_input, user_email),
+                ):
+                    try:
+                        await locator.fill(value)
+                        events.append((event, "ok", value))
+                    except Exception:
+                        events.append((event, "failed", value))
 
             except Exception as e:
-                workflow_results.append(f"⚠️ Field filling failed: {str(e)}")
+                events.append(("fill_fields", "failed", str(e)))
 
             # Step 6: Click Save button
             save_result = await self.click_save_button(page)
-            workflow_results.append(f"💾 Save result: {save_result['message']}")
+            events.append(("save", "ok" if save_result['success'] else "failed", save_result['message']))
             if not save_result['success']:
                 raise Exception("Failed to click save button")
 
             # Step 7: Wait for success message
             success_msg_result = await self.wait_for_success_message(page)
-            workflow_results.append(f"✅ Success message: {success_msg_result['message']}")
+            events.append(("success_message", "ok" if success_msg_result['success'] else "missing", success_msg_result['message']))
 
-            # Step 8: Take screenshot
-            screenshot_b64 = await self.take_screenshot(page)
-            workflow_results.append("📸 Screenshot captured")
+            # Steps 8-9: Take screenshot and verify data in database concurrently
+            screenshot_bytes, final_pref_result = await asyncio.gather(
+                self._screenshot_bytes(page),
+                self.get_current_mhmd_preference()
+            )
+            events.append(("screenshot", "ok", "captured"))
+            events.append(("db_verification", "ok" if final_pref_result.get("success") else "failed", final_pref_result))
 
-            # Step 9: Verify data in database
-            final_pref_result = await self.get_current_mhmd_preference()
-            workflow_results.append(f"🗄️ Final DB state: {final_pref_result}")
-
-            # Step 10: Save screenshot to file
+            # Steps 10-11: Queue the screenshot and database verification files; writes finish in the background
             screenshot_file_path = ""
-            if screenshot_b64:
-                screenshot_file_path = self._save_screenshot_to_file(screenshot_b64, "mhmd_workflow")
-                if screenshot_file_path:
-                    workflow_results.append(f"💾 Screenshot saved to: {screenshot_file_path}")
-                else:
-                    workflow_results.append("⚠️ Failed to save screenshot to file")
-
-            # Step 11: Save database verification to file
             verification_file_path = ""
+            if screenshot_bytes:
+                screenshot_file_path = self._save_screenshot_to_file(screenshot_bytes, "mhmd_workflow")
+                events.append(("save_screenshot", "queued", screenshot_file_path))
             if final_pref_result:
                 verification_file_path = self._save_verification_to_file(final_pref_result, "mhmd_workflow")
-                if verification_file_path:
-                    workflow_results.append(f"💾 Verification data saved to: {verification_file_path}")
-                else:
-                    workflow_results.append("⚠️ Failed to save verification data to file")
+                events.append(("save_verification", "queued", verification_file_path))
+
+            # Encode once, only for the inline copy shipped in the response
+            screenshot_b64 = base64.b64encode(screenshot_bytes).decode() if screenshot_bytes else None
 
             return {
                 "success": True,
                 "message": "MHMD preference toggle workflow completed successfully",
-                "workflow_steps": workflow_results,
+                "workflow_steps": self._format_workflow_steps(events),
                 "screenshot": screenshot_b64,
                 "screenshot_file_path": screenshot_file_path,
                 "final_preference": new_pref,
@@ -813,161 +986,222 @@ class BrowserAutomationService:
             }
 
         except Exception as e:
-            workflow_results.append(f"❌ Error: {str(e)}")
-            screenshot_file_path = ""
-            verification_file_path = ""
-            
-            if page and not page.is_closed():
-                try:
-                    screenshot_b64 = await self.take_screenshot(page)
-                    workflow_results.append("📸 Screenshot captured on error")
-                    
-                    # Save error screenshot to file
-                    screenshot_file_path = self._save_screenshot_to_file(screenshot_b64, "mhmd_workflow_error")
-                    if screenshot_file_path:
-                        workflow_results.append(f"💾 Error screenshot saved to: {screenshot_file_path}")
-                        
-                except Exception as screen_e:
-                    workflow_results.append(f"📸 Screenshot failed on error: {screen_e}")
-            
-            # Save error verification data
-            error_verification = {
-                "success": False,
-                "error": str(e),
-                "workflow_steps": workflow_results
-            }
-            verification_file_path = self._save_verification_to_file(error_verification, "mhmd_workflow_error")
-            if verification_file_path:
-                workflow_results.append(f"💾 Error verification saved to: {verification_file_path}")
+            events.append(("error", "failed", str(e)))
+            error_bytes, screenshot_file_path, verification_file_path, screenshot_error = await self._save_error_artifacts(
+                page, e, "mhmd_workflow", self._format_workflow_steps(events)
+            )
+            if error_bytes:
+                screenshot_b64 = base64.b64encode(error_bytes).decode()
+                events.append(("save_error_screenshot", "queued", screenshot_file_path))
+            elif screenshot_error:
+                events.append(("error_screenshot", "failed", screenshot_error))
+            events.append(("save_error_verification", "queued", verification_file_path))
             
             return {
                 "success": False,
                 "message": f"MHMD preference toggle workflow failed: {str(e)}",
-                "workflow_steps": workflow_results,
+                "workflow_steps": self._format_workflow_steps(events),
                 "screenshot": screenshot_b64,
                 "screenshot_file_path": screenshot_file_path,
                 "verification_file_path": verification_file_path,
                 "error": str(e)
             }
         finally:
-            if page and not page.is_closed():
-                await page.close()
+            if page:
+                await self._release_page(page)
     
+    async def _submit_parse(self, user_message: str) -> ParsedCommand:
+        """Queue a command for the batch parser and wait for its result"""
+        if not self._parse_worker or self._parse_worker.done():
+            self._parse_worker = asyncio.create_task(self._parse_batch_worker())
+        future = asyncio.get_running_loop().create_future()
+        self._parse_queue.put_nowait((user_message, future))
+        return await future
+
+    async def _parse_batch_worker(self):
+        """Collect commands for up to PARSE_BATCH_WINDOW and parse them in one request"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._parse_queue.get()]
+            deadline = loop.time() + PARSE_BATCH_WINDOW
+            while len(batch) < PARSE_BATCH_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._parse_queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            # Dispatch without awaiting so batches still run concurrently up to the LLM semaphore
+            task = asyncio.create_task(self._resolve_parse_batch(batch))
+            self._parse_batch_tasks.add(task)
+            task.add_done_callback(self._parse_batch_tasks.discard)
+
+    async def _resolve_parse_batch(self, batch: List[Tuple[str, asyncio.Future]]):
+        """Parse a collected batch and resolve each waiting future"""
+        try:
+            results = await self._parse_batch([message for message, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def _parse_batch(self, user_messages: List[str]) -> List[ParsedCommand]:
+        """Parse one or more commands with a single OpenAI request"""
+        if len(user_messages) == 1:
+            content = user_messages[0]
+        else:
+            numbered = "\n".join(f"{i}. {message}" for i, message in enumerate(user_messages, 1))
+            content = f"Parse each of the following commands independently and return one result per command, in order:\n{numbered}"
+        
+        # Rough estimate of ~4 characters per token
+        est_tokens = (len(NL_PARSER_SYSTEM_MESSAGE.content) + len(content)) // 4
+        await self._bucket.acquire(est_tokens)
+        async with self._llm_sem:
+            if len(user_messages) == 1:
+                parsed = await self._parser_llm.ainvoke([NL_PARSER_SYSTEM_MESSAGE, HumanMessage(content=content)])
+                return [parsed]
+            parsed_batch = await self._batch_parser_llm.ainvoke([NL_PARSER_SYSTEM_MESSAGE, HumanMessage(content=content)])
+        
+        if len(parsed_batch.commands) != len(user_messages):
+            raise ValueError(f"Expected {len(user_messages)} parsed commands, got {len(parsed_batch.commands)}")
+        return parsed_batch.commands
+
+    @staticmethod
+    def _normalize_command(command: str) -> str:
+        """Cache key for a command: lowercased, whitespace-collapsed, edge punctuation stripped"""
+        tokens = (token.strip(CACHE_KEY_STRIP_CHARS) for token in command.lower().split())
+        return " ".join(token for token in tokens if token)
+
+    async def _parse_command(self, command: str, user_message: str) -> ParsedCommand:
+        """Parse a command with the LLM, reusing cached results for identical commands"""
+        key = self._normalize_command(command)
+        cached = self._parse_cache.get(key)
+        if cached is not None:
+            self._parse_cache.move_to_end(key)
+            logger.info("Parse cache_hit=True for command: %s", key)
+            return cached.model_copy()
+        
+        parsed = await self._submit_parse(user_message)
+        self._parse_cache[key] = parsed
+        if len(self._parse_cache) > PARSE_CACHE_SIZE:
+            self._parse_cache.popitem(last=False)
+        return parsed.model_copy()
+
+    def submit_command(self, command: str, base_url: str = "http://localhost:3000") -> asyncio.Future:
+        """Queue a natural language command for the worker pool and return a future for its result"""
+        future = asyncio.get_running_loop().create_future()
+        self._command_queue.put_nowait((command, base_url, future))
+        return future
+
+    async def _command_worker(self):
+        """Serve queued commands one at a time; COMMAND_WORKERS of these run side by side"""
+        while True:
+            command, base_url, future = await self._command_queue.get()
+            try:
+                # Skip commands whose caller has already gone away
+                if not future.cancelled():
+                    result = await self._process_command(command, base_url)
+                    if not future.done():
+                        future.set_result(result)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            finally:
+                self._command_queue.task_done()
+
     async def process_natural_language_command(self, command: str, base_url: str = "http://localhost:3000") -> Dict[str, Any]:
+        """Process a natural language command through the bounded command worker pool."""
+        if not self._command_workers:
+            # Workers start with the browser; without them, run inline and let the workflow report it
+            return await self._process_command(command, base_url)
+        return await self.submit_command(command, base_url)
+
+    async def _check_backend_health(self, backend_url: str) -> Optional[str]:
+        """Probe the backend health endpoint and return an error message if it is unreachable"""
+        try:
+            response = await self._backend_http_client.get(f"{backend_url}/health")
+            if response.status_code != 200:
+                return f"Backend health check returned HTTP {response.status_code}"
+            return None
+        except httpx.HTTPError as e:
+            return f"Backend at {backend_url} is unreachable: {e}"
+
+    async def _process_command(self, command: str, base_url: str) -> Dict[str, Any]:
         """Process a natural language command using the Langchain agent or direct execution."""
+        # Probe the backend while the command is parsed; only swagger workflows wait on it
+        health_task = asyncio.create_task(self._check_backend_health(BACKEND_URL))
         try:
-            logger.info(f"Processing command: {command}")
-            logger.info(f"Using base URL: {base_url}")
+            logger.info("Processing command: %s (base URL: %s)", command, base_url)
             
-            # Enhanced system message to handle multiple workflow types
-            system_message = """You are an expert at parsing natural language commands for a web automation tool that supports multiple workflows.
-
-Analyze the command and respond with ONLY a valid JSON object containing:
-- workflow_type: string ("mhmd_only", "swagger_only", or "combined")
-- name: string or null (user's name if specified, null if not)
-- email: string or null (user's email if specified, null if not specified or if random is requested)
-- preference: string or null (OPT_IN or OPT_OUT if specified, null if not)
-
-Workflow Detection Rules:
-- "mhmd_only": Commands about preferences, toggling MHMD, visiting preferences page, adding users WITHOUT API/Swagger testing
-- "swagger_only": Commands ONLY about API testing, Swagger UI, verifying existing users via API
-- "combined": Commands that explicitly mention BOTH creating/adding users AND testing/verifying via Swagger/API
-
-IMPORTANT: Only use "combined" or "swagger_only" if the command explicitly mentions API testing, Swagger UI, or API verification. Default to "mhmd_only" for simple user creation or preference changes.
-
-Examples:
-- "Visit preferences add John with random email and opt him in" -> {"workflow_type": "mhmd_only", "name": "John", "email": null, "preference": "OPT_IN"}
-- "Add user Sarah with email sarah@test.com and opt her out" -> {"workflow_type": "mhmd_only", "name": "Sarah", "email": "sarah@test.com", "preference": "OPT_OUT"}
-- "Test the API endpoint via Swagger UI" -> {"workflow_type": "swagger_only", "name": null, "email": null, "preference": null}
-- "Create test user and verify via swagger UI" -> {"workflow_type": "combined", "name": null, "email": null, "preference": null}
-- "Add John Doe with john@example.com and test via API" -> {"workflow_type": "combined", "name": "John Doe", "email": "john@example.com", "preference": null}
-- "Toggle preferences for Mike" -> {"workflow_type": "mhmd_only", "name": "Mike", "email": null, "preference": null}
-
-CRITICAL: Respond ONLY with valid JSON. No explanations, no markdown, no extra text."""
-
             user_message = f"Command: {command}"
             
-            # Create messages manually to avoid template formatting issues
-            from langchain_core.messages import SystemMessage, HumanMessage
-            messages = [SystemMessage(content=system_message), HumanMessage(content=user_message)]
-            
-            response = await self.llm.ainvoke(messages)
-            logger.info(f"OpenAI response: {response.content}")
-            
-            # Parse the JSON response with improved error handling
-            import json
-            import re
-            
             try:
-                # Clean the response content to extract JSON
-                content = response.content.strip()
-                logger.info(f"Cleaned content: {content}")
-                
-                # Try to extract JSON from the response if it's wrapped in markdown or other text
-                json_match = re.search(r'\{[^{}]*\}', content)
-                if json_match:
-                    content = json_match.group(0)
-                    logger.info(f"Extracted JSON: {content}")
-                
-                parsed_data = json.loads(content)
-                logger.info(f"Parsed data: {parsed_data}")
+                parsed = await self._parse_command(command, user_message)
+                logger.info("Parsed data: %s", parsed)
+            except ValueError as parse_error:
+                logger.warning("Failed to parse OpenAI response: %s", parse_error)
                 
-                # Validate the parsed data structure
-                if not isinstance(parsed_data, dict):
-                    raise ValueError("Response is not a JSON object")
-                
-                # Determine workflow type and execute accordingly
-                workflow_type = parsed_data.get("workflow_type", "mhmd_only")
-                logger.info(f"Detected workflow type: {workflow_type}")
-                
-                if workflow_type == "combined":
-                    # Execute combined MHMD + Swagger workflow with parsed input
-                    workflow_input = MHMDWorkflowInput(
-                        name=parsed_data.get("name"),
-                        email=parsed_data.get("email"),
-                        preference=MHMDPreference(parsed_data["preference"]) if parsed_data.get("preference") else None
-                    )
-                    workflow_result = await self.execute_combined_mhmd_swagger_workflow(
-                        workflow_input=workflow_input,
-                        base_url_frontend=base_url,
-                        base_url_backend="http://localhost:8000"
-                    )
-                    return workflow_result
-                    
-                elif workflow_type == "swagger_only":
-                    # Execute only Swagger API test workflow
-                    workflow_result = await self.execute_swagger_api_test_workflow("http://localhost:8000")
-                    return workflow_result
-                    
-                else:  # mhmd_only or default
-                    # Execute MHMD workflow only
-                    workflow_input = MHMDWorkflowInput(
-                        name=parsed_data.get("name"),
-                        email=parsed_data.get("email"),
-                        preference=MHMDPreference(parsed_data["preference"]) if parsed_data.get("preference") else None
-                    )
-                    logger.info(f"Created workflow input: {workflow_input}")
-                    workflow_result = await self.execute_mhmd_toggle_workflow(workflow_input, base_url)
-                    return workflow_result
-                
-            except (json.JSONDecodeError, ValueError, KeyError) as parse_error:
-                logger.warning(f"Failed to parse OpenAI response: {parse_error}")
-                logger.warning(f"Raw response content: {response.content}")
-                
-                # Provide user-friendly error message with the actual AI response
+                # Provide user-friendly error message
                 return {
                     "success": False,
-                    "message": f"I couldn't parse the AI response properly. The AI returned: '{response.content}'. This seems to be a JSON parsing issue. Please try a simpler command like 'Visit preferences and take screenshot'",
-                    "error": f"JSON parsing failed: {str(parse_error)}",
-                    "raw_ai_response": response.content
+                    "message": "I couldn't parse the AI response properly. Please try a simpler command like 'Visit preferences and take screenshot'",
+                    "error": f"Structured output parsing failed: {str(parse_error)}"
                 }
+            
+            # Determine workflow type and execute accordingly
+            workflow_type = parsed.workflow_type
+            logger.info("Detected workflow type: %s", workflow_type)
+
+            if workflow_type in ("combined", "swagger_only"):
+                health_error = await health_task
+                if health_error:
+                    return {
+                        "success": False,
+                        "message": f"Backend API is not available, skipping the {workflow_type} workflow",
+                        "error": health_error
+                    }
+
+            # Fields were already validated as a ParsedCommand, so skip revalidation
+            workflow_input = MHMDWorkflowInput.model_construct(
+                name=parsed.name,
+                email=parsed.email,
+                preference=parsed.preference
+            )
+            
+            if workflow_type == "combined":
+                # Execute combined MHMD + Swagger workflow with parsed input
+                workflow_result = await self.execute_combined_mhmd_swagger_workflow(
+                    workflow_input=workflow_input,
+                    base_url_frontend=base_url,
+                    base_url_backend=BACKEND_URL
+                )
+                return workflow_result
+                
+            elif workflow_type == "swagger_only":
+                # Execute only Swagger API test workflow
+                workflow_result = await self.execute_swagger_api_test_workflow(BACKEND_URL)
+                return workflow_result
+                
+            else:  # mhmd_only or default
+                # Execute MHMD workflow only
+                workflow_result = await self.execute_mhmd_toggle_workflow(workflow_input, base_url)
+                return workflow_result
 
         except Exception as e:
-            logger.error(f"Error processing command: {e}", exc_info=True)
+            logger.error("Error processing command: %s", e, exc_info=True)
             return {
                 "success": False,
                 "message": f"An error occurred while processing your command: {str(e)}. Please check that the frontend is running on the correct port and try again.",
                 "error": str(e)
             }
+        finally:
+            health_task.cancel()
 
 # Forward reference resolution not needed for LangChain BaseTool
@@ -1,11 +1,32 @@
-import json
+import copy
+import functools
+import logging
 import os
+import threading
+
+import orjson
 from typing import Optional
 from models import UserData, MHMDPreference
 
+logger = logging.getLogger(__name__)
+
+# Buffer size for data file writes, so a save is a single write syscall
+WRITE_BUFFER_SIZE = 1 << 20
+# Saves landing within this many seconds are coalesced into one file write.
+# The cache and pending write are per process: with WORKERS>1, other workers
+# only see a save once it has been flushed to the file.
+PERSIST_DEBOUNCE_SECONDS = 0.2
+
 class JSONDataService:
     def __init__(self, data_file: str = "user_data.json"):
         self.data_file = data_file
+        # Serializes read-modify-write cycles when called from worker threads
+        self._lock = threading.RLock()
+        # Parsed file contents, trusted while the file's mtime is unchanged
+        self._cache: Optional[dict] = None
+        self._mtime: Optional[int] = None
+        # Pending debounced write of the cached data, if any
+        self._persist_timer: Optional[threading.Timer] = None
         self.ensure_data_file_exists()
     
     def ensure_data_file_exists(self):
@@ -18,28 +39,81 @@ class JSONDataService:
                     "mhmd_preference": "OPT_OUT"
                 }
             }
-            with open(self.data_file, 'w') as f:
-                json.dump(default_data, f, indent=2)
+            self._write(default_data)
     
     def load_data(self) -> dict:
-        """Load data from JSON file"""
-        try:
-            with open(self.data_file, 'r') as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            # Return default data if file doesn't exist or is corrupted
-            return {
-                "user": {
-                    "name": "",
-                    "email": "",
-                    "mhmd_preference": "OPT_OUT"
+        """Load data from JSON file, reparsing only when the file has changed"""
+        # Held so a read never interleaves with a save or flush on another thread
+        with self._lock:
+            # Unpersisted saves are newer than the file, so serve them as-is
+            if self._persist_timer is not None:
+                return copy.deepcopy(self._cache)
+            try:
+                mtime = os.stat(self.data_file).st_mtime_ns
+                if self._cache is None or mtime != self._mtime:
+                    with open(self.data_file, 'rb') as f:
+                        self._cache = orjson.loads(f.read())
+                    self._mtime = mtime
+                # Callers mutate the returned dict, so never hand out the cached one
+                return copy.deepcopy(self._cache)
+            except (FileNotFoundError, orjson.JSONDecodeError):
+                # Return default data if file doesn't exist or is corrupted
+                return {
+                    "user": {
+                        "name": "",
+                        "email": "",
+                        "mhmd_preference": "OPT_OUT"
+                    }
                 }
-            }
     
     def save_data(self, data: dict):
-        """Save data to JSON file"""
-        with open(self.data_file, 'w') as f:
-            json.dump(data, f, indent=2)
+        """Update the cache now and persist it to the JSON file shortly after"""
+        with self._lock:
+            self._cache = copy.deepcopy(data)
+            if self._mtime is None:
+                self._mtime = self._stat_mtime()
+            if self._persist_timer is None:
+                self._schedule_persist()
+    
+    def flush(self):
+        """Write any pending cached data to the JSON file"""
+        with self._lock:
+            timer, self._persist_timer = self._persist_timer, None
+            if timer is None:
+                return
+            timer.cancel()
+            try:
+                self._write(self._cache)
+            except Exception as e:
+                # Keep the write pending, so reads still serve the unsaved data, and try again
+                logger.error("Error persisting user data, retrying: %s", e)
+                self._schedule_persist()
+    
+    def _schedule_persist(self):
+        """Start the debounce timer that flushes the cache to the file"""
+        self._persist_timer = threading.Timer(PERSIST_DEBOUNCE_SECONDS, self.flush)
+        self._persist_timer.daemon = True
+        self._persist_timer.start()
+    
+    def _write(self, data: dict):
+        """Write data to the JSON file and remember its mtime"""
+        # Serialize up front and hand the bytes to one buffered write
+        payload = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+        # Write beside the file and swap it in, so readers in any process never see a partial file
+        tmp_file = f"{self.data_file}.{os.getpid()}.tmp"
+        with open(tmp_file, 'wb', buffering=WRITE_BUFFER_SIZE) as f:
+            f.write(payload)
+        os.replace(tmp_file, self.data_file)
+        # Write through to the cache so the next load skips the parse
+        self._cache = copy.deepcopy(data)
+        self._mtime = self._stat_mtime()
+    
+    def _stat_mtime(self) -> Optional[int]:
+        """Modification time of the data file, or None if it is missing"""
+        try:
+            return os.stat(self.data_file).st_mtime_ns
+        except FileNotFoundError:
+            return None
     
     def get_user_data(self) -> Optional[UserData]:
         """Get user data"""
@@ -61,13 +135,14 @@ class JSONDataService:
     def save_user_data(self, user_data: UserData) -> bool:
         """Save user data"""
         try:
-            data = self.load_data()
-            data["user"] = {
-                "name": user_data.name,
-                "email": user_data.email,
-                "mhmd_preference": user_data.mhmd_preference.value
-            }
-            self.save_data(data)
+            with self._lock:
+                data = self.load_data()
+                data["user"] = {
+                    "name": user_data.name,
+                    "email": user_data.email,
+                    "mhmd_preference": user_data.mhmd_preference.value
+                }
+                self.save_data(data)
             return True
         except Exception as e:
             print(f"Error saving user data: {e}")
@@ -76,19 +151,20 @@ class JSONDataService:
     def update_user_data(self, **kwargs) -> Optional[UserData]:
         """Update specific fields of user data"""
         try:
-            data = self.load_data()
-            user_data = data.get("user", {})
-            
-            # Update only provided fields
-            if "name" in kwargs and kwargs["name"] is not None:
-                user_data["name"] = kwargs["name"]
-            if "email" in kwargs and kwargs["email"] is not None:
-                user_data["email"] = str(kwargs["email"])
-            if "mhmd_preference" in kwargs and kwargs["mhmd_preference"] is not None:
-                user_data["mhmd_preference"] = kwargs["mhmd_preference"].value
-            
-            data["user"] = user_data
-            self.save_data(data)
+            with self._lock:
+                data = self.load_data()
+                user_data = data.get("user", {})
+                
+                # Update only provided fields
+                if "name" in kwargs and kwargs["name"] is not None:
+                    user_data["name"] = kwargs["name"]
+                if "email" in kwargs and kwargs["email"] is not None:
+                    user_data["email"] = str(kwargs["email"])
+                if "mhmd_preference" in kwargs and kwargs["mhmd_preference"] is not None:
+                    user_data["mhmd_preference"] = kwargs["mhmd_preference"].value
+                
+                data["user"] = user_data
+                self.save_data(data)
             
             # Return updated user data if complete
             if user_data.get("name") and user_data.get("email"):
@@ -117,3 +193,9 @@ class JSONDataService:
         except Exception as e:
             print(f"Error deleting user data: {e}")
             return False
+
+
+@functools.lru_cache(maxsize=None)
+def get_data_service(data_file: str = "user_data.json") -> JSONDataService:
+    """Shared service per data file, so its cache and lock are process-wide"""
+    return JSONDataService(data_file)
@@ -1,19 +1,23 @@
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 import json
 import asyncio
 import logging
+import random
+import secrets
 
 # Configure logging
 logger = logging.getLogger("uvicorn")
 import os
 import platform
 from dotenv import load_dotenv
+import httpx
+import orjson
 from models import UserData, UserResponse, UserUpdateRequest, MHMDPreference, AICommandRequest, AICommandResponse, MCPCallRequest, MCPResponse
-from data_service import JSONDataService
+from data_service import get_data_service
 from ai_automation_service import BrowserAutomationService
 from playwright.async_api import async_playwright
 import mcp_server
@@ -21,8 +25,27 @@ import mcp_server
 # Load environment variables
 load_dotenv()
 
-# State dictionary to hold the automation service instance
-state = {}
+# /mcp/tools payload, serialized once since the tool definitions never change at runtime
+MCP_TOOLS_RESPONSE_JSON = orjson.dumps({"success": True, "data": mcp_server.TOOLS, "error": None})
+
+# Static route payloads, serialized once at import
+ROOT_RESPONSE_JSON = orjson.dumps({"status": "healthy", "message": "NextJS FastAPI MCP Server is running"})
+HEALTH_RESPONSE_JSON = {
+    connected: orjson.dumps({
+        "status": "healthy",
+        "message": f"Server is running. MCP status: {'connected' if connected else 'disconnected'}"
+    })
+    for connected in (True, False)
+}
+EXAMPLE_RESPONSE_JSON = orjson.dumps({
+    "message": "Hello from FastAPI!",
+    "timestamp": "2025-01-07T00:17:59-05:00",
+    "data": [
+        {"id": 1, "name": "Item 1"},
+        {"id": 2, "name": "Item 2"},
+        {"id": 3, "name": "Item 3"}
+    ]
+})
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -32,10 +55,18 @@ async def lifespan(app: FastAPI):
         if not openai_api_key:
             raise ValueError("OPENAI_API_KEY not found in .env file")
 
+        # Keep-alive HTTP/2 pool for OpenAI calls, owned by the app lifespan
+        openai_http = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=100, keepalive_expiry=60.0),
+            timeout=30.0
+        )
+        app.state.openai_http = openai_http
+
         # Pass the playwright instance to the service
-        automation_service = BrowserAutomationService(p, openai_api_key)
+        automation_service = BrowserAutomationService(p, openai_api_key, http_client=openai_http)
         await automation_service.initialize_browser()
-        state["automation_service"] = automation_service
+        app.state.automation_service = automation_service
         
         # Inject the automation service into the MCP server
         mcp_server.set_automation_service(automation_service)
@@ -43,7 +74,10 @@ async def lifespan(app: FastAPI):
         
         yield
         
-        await state["automation_service"].shutdown_browser()
+        await app.state.automation_service.shutdown_browser()
+        await app.state.openai_http.aclose()
+        # Persist any user data still waiting on the write debounce
+        await run_in_threadpool(get_data_service().flush)
         print("BrowserAutomationService shut down.")
 
 app = FastAPI(
@@ -52,7 +86,9 @@ app = FastAPI(
     description="A FastAPI server with MCP integration and AI browser automation capabilities",
     docs_url="/docs",
     redoc_url="/redoc",
-    lifespan=lifespan
+    lifespan=lifespan,
+    # orjson serializes large MCP payloads much faster than the stdlib encoder
+    default_response_class=ORJSONResponse
 )
 
 # Configure CORS for NextJS frontend
@@ -64,160 +100,24 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Pydantic models for request/response
-class MCPRequest(BaseModel):
-    method: str
-    params: Optional[Dict[str, Any]] = None
-
-class MCPResponse(BaseModel):
-    success: bool
-    data: Optional[Any] = None
-    error: Optional[str] = None
-
-class HealthResponse(BaseModel):
-    status: str
-    message: str
-
-# Enhanced MCP tools including AI browser automation
-MCP_TOOLS = [
-    {
-        "name": "echo",
-        "description": "Echo back the input message",
-        "inputSchema": {
-            "type": "object",
-            "properties": {
-                "message": {
-                    "type": "string",
-                    "description": "Message to echo back"
-                }
-            },
-            "required": ["message"]
-        }
-    },
-    {
-        "name": "calculate",
-        "description": "Perform basic arithmetic calculations",
-        "inputSchema": {
-            "type": "object",
-            "properties": {
-                "operation": {
-                    "type": "string",
-                    "enum": ["add", "subtract", "multiply", "divide"],
-                    "description": "Arithmetic operation to perform"
-                },
-                "a": {
-                    "type": "number",
-                    "description": "First number"
-                },
-                "b": {
-                    "type": "number",
-                    "description": "Second number"
-                }
-            },
-            "required": ["operation", "a", "b"]
-        }
-    },
-    {
-        "name": "get_system_info",
-        "description": "Get basic system information",
-        "inputSchema": {
-            "type": "object",
-            "properties": {},
-            "additionalProperties": False
-        }
-    },
-    {
-        "name": "ai_browser_automation",
-        "description": "Execute complex browser automation tasks using natural language commands",
-        "inputSchema": {
-            "type": "object",
-            "properties": {
-                "command": {
-                    "type": "string",
-                    "description": "Natural language command describing the browser automation task"
-                },
-                "base_url": {
-                    "type": "string",
-                    "description": "Base URL to navigate to (defaults to http://localhost:3000)"
-                }
-            },
-            "required": ["command"]
-        }
-    },
-    {
-        "name": "mhmd_toggle_workflow",
-        "description": "Execute the MHMD preference toggle workflow with database persistence",
-        "inputSchema": {
-            "type": "object",
-            "properties": {
-                "name": {
-                    "type": "string",
-                    "description": "User name (optional)"
-                },
-                "email": {
-                    "type": "string",
-                    "description": "User email (optional)"
-                },
-                "preference": {
-                    "type": "string",
-                    "enum": ["OPT_IN", "OPT_OUT"],
-                    "description": "MHMD preference (optional - will toggle if not specified)"
-                },
-                "base_url": {
-                    "type": "string",
-                    "description": "Base URL to navigate to (defaults to http://localhost:3000)"
-                }
-            },
-            "required": []
-        }
-    },
-    {
-        "name": "take_screenshot",
-        "description": "Navigate to a page and capture a screenshot",
-        "inputSchema": {
-            "type": "object",
-            "properties": {
-                "url": {
-                    "type": "string",
-                    "description": "URL to navigate to and screenshot"
-                },
-                "wait_for": {
-                    "type": "string",
-                    "description": "CSS selector to wait for before screenshot (optional)"
-                }
-            },
-            "required": ["url"]
-        }
-    }
-]
-
 # Simulated MCP session status
 mcp_connected = True
 
 # Initialize JSON data service
-data_service = JSONDataService()
-
+data_service = get_data_service()
 
-
-@app.get("/", response_model=HealthResponse)
+@app.get("/")
 async def root():
     """Health check endpoint"""
-    return HealthResponse(
-        status="healthy",
-        message="NextJS FastAPI MCP Server is running"
-    )
+    return Response(content=ROOT_RESPONSE_JSON, media_type="application/json")
 
-@app.get("/health", response_model=HealthResponse)
+@app.get("/health")
 async def health_check():
     """Detailed health check including MCP status"""
-    mcp_status = "connected" if mcp_connected else "disconnected"
-    return HealthResponse(
-        status="healthy",
-        message=f"Server is running. MCP status: {mcp_status}"
-    )
+    return Response(content=HEALTH_RESPONSE_JSON[mcp_connected], media_type="application/json")
 
 @app.post("/mcp/call", response_model=MCPResponse)
-async def call_mcp_method(request: MCPRequest):
+async def call_mcp_method(request: MCPCallRequest):
     """Call an MCP method through the unified MCP server"""
     if not mcp_connected:
         raise HTTPException(
@@ -234,9 +134,13 @@ async def call_mcp_method(request: MCPRequest):
         mcp_result = await mcp_server.call_tool(method, params)
         
         # Convert MCP result to our API format
-        if mcp_result and len(mcp_result) > 0:
+        if mcp_result and len(mcp_result) == 1 and mcp_result[0].get('type') == 'text':
+            # Common case: a single text block needs no filtering or joining
+            result = [{"type": "text", "text": mcp_result[0].get('text', '')}]
+        elif mcp_result:
             # Combine all text content from MCP response (mcp_result is list of dicts)
-            combined_text = "\n".join([content.get('text', '') for content in mcp_result if content.get('type') == 'text'])
+            texts = [content.get('text', '') for content in mcp_result if content.get('type') == 'text']
+            combined_text = texts[0] if len(texts) == 1 else "\n".join(texts)
             result = [{"type": "text", "text": combined_text}]
         else:
             result = [{"type": "text", "text": "No result returned from MCP server"}]
@@ -246,49 +150,50 @@ async def call_mcp_method(request: MCPRequest):
             data=result
         )
     except Exception as e:
-        logger.error(f"MCP call failed: {e}", exc_info=True)
+        logger.error("MCP call failed: %s", e, exc_info=True)
         return MCPResponse(
             success=False,
             error=str(e)
         )
 
+@app.post("/mcp/call_stream")
+async def call_mcp_method_stream(request: MCPCallRequest):
+    """Stream an MCP call's results as NDJSON, one line per content block or finished batch operation"""
+    if not mcp_connected:
+        raise HTTPException(
+            status_code=503,
+            detail="MCP client not initialized"
+        )
+
+    async def ndjson_lines():
+        try:
+            async for item in mcp_server.stream_tool_results(request.method, request.params or {}):
+                yield orjson.dumps(item) + b"\n"
+        except Exception as e:
+            logger.error("MCP stream failed: %s", e, exc_info=True)
+            yield orjson.dumps({"type": "error", "error": str(e)}) + b"\n"
+
+    return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+
 @app.get("/mcp/tools")
 async def list_mcp_tools():
     """List available MCP tools"""
-    try:
-        # Get tools from the simulated MCP server
-        tools = await mcp_server.list_tools()
-        return MCPResponse(
-            success=True,
-            data=tools
-        )
-    except Exception as e:
-        return MCPResponse(
-            success=False,
-            error=str(e)
-        )
+    # Pre-serialized at import; skips building and validating the response per request
+    return Response(content=MCP_TOOLS_RESPONSE_JSON, media_type="application/json")
 
 
 
 @app.get("/api/example")
 async def example_endpoint():
     """Example API endpoint for NextJS frontend"""
-    return {
-        "message": "Hello from FastAPI!",
-        "timestamp": "2025-01-07T00:17:59-05:00",
-        "data": [
-            {"id": 1, "name": "Item 1"},
-            {"id": 2, "name": "Item 2"},
-            {"id": 3, "name": "Item 3"}
-        ]
-    }
+    return Response(content=EXAMPLE_RESPONSE_JSON, media_type="application/json")
 
 # User Data API Endpoints
 @app.get("/api/user", response_model=UserResponse)
 async def get_user_data():
     """Get user data"""
     try:
-        user_data = data_service.get_user_data()
+        user_data = await run_in_threadpool(data_service.get_user_data)
         if user_data:
             return UserResponse(
                 success=True,
@@ -307,7 +212,7 @@ async def get_user_data():
 async def create_user_data(user_data: UserData):
     """Create or update user data"""
     try:
-        success = data_service.save_user_data(user_data)
+        success = await run_in_threadpool(data_service.save_user_data, user_data)
         if success:
             return UserResponse(
                 success=True,
@@ -324,9 +229,9 @@ async def update_user_data(update_request: UserUpdateRequest):
     """Update specific fields of user data"""
     try:
         # Convert update request to dict, excluding None values
-        update_data = {k: v for k, v in update_request.dict().items() if v is not None}
+        update_data = update_request.model_dump(exclude_none=True)
         
-        updated_user = data_service.update_user_data(**update_data)
+        updated_user = await run_in_threadpool(data_service.update_user_data, **update_data)
         if updated_user:
             return UserResponse(
                 success=True,
@@ -345,7 +250,7 @@ async def update_user_data(update_request: UserUpdateRequest):
 async def delete_user_data():
     """Delete user data (reset to defaults)"""
     try:
-        success = data_service.delete_user_data()
+        success = await run_in_threadpool(data_service.delete_user_data)
         if success:
             return UserResponse(
                 success=True,
@@ -360,18 +265,15 @@ async def delete_user_data():
 async def create_test_user():
     """Create a test user with random MHMD preference"""
     try:
-        import random
-        import string
-        
         # Generate random test user data
-        random_id = ''.join(random.choices(string.ascii_lowercase + string.digits, k=6))
+        random_id = secrets.token_hex(3)
         test_user = UserData(
             name=f"Test User {random_id}",
             email=f"testuser_{random_id}@example.com",
             mhmd_preference=random.choice([MHMDPreference.OPT_IN, MHMDPreference.OPT_OUT])
         )
         
-        success = data_service.save_user_data(test_user)
+        success = await run_in_threadpool(data_service.save_user_data, test_user)
         if success:
             return UserResponse(
                 success=True,
@@ -390,4 +292,15 @@ async def create_test_user():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
+    # DEBUG=1 keeps auto-reload for development. Otherwise run WORKERS processes;
+    # each worker runs the lifespan and owns its own browser pool and automation service.
+    debug = os.getenv("DEBUG", "").lower() in ("1", "true")
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        reload=debug,
+        workers=1 if debug else int(os.getenv("WORKERS", "1")),
+        log_level="info",
+        access_log=debug
+    )
@@ -6,289 +6,476 @@ This server provides a unified interface for all tool interactions.
 
 import asyncio
 import json
+import logging
 import os
 import platform
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from models import MHMDWorkflowInput, MHMDPreference
+
+logger = logging.getLogger(__name__)
 
 # Global reference to the automation service (will be injected from main.py)
 _automation_service = None
 
+# Preference strings accepted by mhmd_toggle_workflow, resolved without enum validation per call
+_PREF_LOOKUP = {pref.value: pref for pref in MHMDPreference}
+
+# Default number of batch_execute operations allowed to run at once
+BATCH_MAX_CONCURRENT = 5
+
+# Optional pre-captured Playwright storage state (cookies/localStorage) for screenshot contexts
+STORAGE_STATE_PATH = "state.json"
+
 def set_automation_service(service):
     """Set the automation service instance for AI tools"""
     global _automation_service
     _automation_service = service
 
-async def list_tools() -> List[Dict[str, Any]]:
-    """List available AI automation tools"""
-    tools = [
-        # AI Browser Automation tools
-        {
-            "name": "ai_browser_automation",
-            "description": "Execute complex browser automation tasks using natural language commands. Can navigate pages, fill forms, toggle preferences, take screenshots, and more.",
-            "inputSchema": {
-                "type": "object",
-                "properties": {
-                    "command": {
-                        "type": "string",
-                        "description": "Natural language command describing the browser automation task to perform"
-                    },
-                    "base_url": {
-                        "type": "string",
-                        "description": "Base URL to navigate to (defaults to http://localhost:3000)",
-                        "default": "http://localhost:3000"
-                    }
+# Tool definitions, built once at import and shared by every list_tools() call
+TOOLS: List[Dict[str, Any]] = [
+    # AI Browser Automation tools
+    {
+        "name": "ai_browser_automation",
+        "description": "Execute complex browser automation tasks using natural language commands. Can navigate pages, fill forms, toggle preferences, take screenshots, and more.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "command": {
+                    "type": "string",
+                    "description": "Natural language command describing the browser automation task to perform"
                 },
-                "required": ["command"]
-            }
-        },
-        {
-            "name": "mhmd_toggle_workflow",
-            "description": "Execute the specific MHMD (My Health My Data) preference toggle workflow. Navigates to preferences, toggles MHMD setting, saves to database, and captures screenshot.",
-            "inputSchema": {
-                "type": "object",
-                "properties": {
-                    "name": {
-                        "type": "string",
-                        "description": "User name (optional)"
-                    },
-                    "email": {
-                        "type": "string",
-                        "description": "User email (optional)"
-                    },
-                    "preference": {
-                        "type": "string",
-                        "enum": ["OPT_IN", "OPT_OUT"],
-                        "description": "MHMD preference to set (optional - will toggle current if not specified)"
-                    },
-                    "base_url": {
-                        "type": "string",
-                        "description": "Base URL to navigate to (defaults to http://localhost:3000)",
-                        "default": "http://localhost:3000"
-                    }
+                "base_url": {
+                    "type": "string",
+                    "description": "Base URL to navigate to (defaults to http://localhost:3000)",
+                    "default": "http://localhost:3000"
+                }
+            },
+            "required": ["command"]
+        }
+    },
+    {
+        "name": "mhmd_toggle_workflow",
+        "description": "Execute the specific MHMD (My Health My Data) preference toggle workflow. Navigates to preferences, toggles MHMD setting, saves to database, and captures screenshot.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "name": {
+                    "type": "string",
+                    "description": "User name (optional)"
                 },
-                "required": []
-            }
-        },
-        {
-            "name": "take_screenshot",
-            "description": "Navigate to a specific page and capture a screenshot",
-            "inputSchema": {
-                "type": "object",
-                "properties": {
-                    "url": {
-                        "type": "string",
-                        "description": "URL to navigate to and screenshot"
-                    },
-                    "wait_for": {
-                        "type": "string",
-                        "description": "CSS selector to wait for before taking screenshot (optional)"
-                    }
+                "email": {
+                    "type": "string",
+                    "description": "User email (optional)"
+                },
+                "preference": {
+                    "type": "string",
+                    "enum": ["OPT_IN", "OPT_OUT"],
+                    "description": "MHMD preference to set (optional - will toggle current if not specified)"
+                },
+                "base_url": {
+                    "type": "string",
+                    "description": "Base URL to navigate to (defaults to http://localhost:3000)",
+                    "default": "http://localhost:3000"
+                }
+            },
+            "required": []
+        }
+    },
+    {
+        "name": "take_screenshot",
+        "description": "Navigate to a specific page and capture a screenshot",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "url": {
+                    "type": "string",
+                    "description": "URL to navigate to and screenshot"
                 },
-                "required": ["url"]
-            }
-        },
-        {
-            "name": "swagger_api_test_workflow",
-            "description": "Execute the Swagger UI API testing workflow: creates a test user with random MHMD preference and verifies it through Swagger UI docs by testing the GET /api/user endpoint",
-            "inputSchema": {
-                "type": "object",
-                "properties": {
-                    "base_url": {
-                        "type": "string",
-                        "description": "Base URL for the API server (defaults to http://localhost:8000)",
-                        "default": "http://localhost:8000"
+                "wait_for": {
+                    "type": "string",
+                    "description": "CSS selector to wait for before taking screenshot (optional)"
+                }
+            },
+            "required": ["url"]
+        }
+    },
+    {
+        "name": "swagger_api_test_workflow",
+        "description": "Execute the Swagger UI API testing workflow: creates a test user with random MHMD preference and verifies it through Swagger UI docs by testing the GET /api/user endpoint",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "base_url": {
+                    "type": "string",
+                    "description": "Base URL for the API server (defaults to http://localhost:8000)",
+                    "default": "http://localhost:8000"
+                }
+            },
+            "required": []
+        }
+    },
+    {
+        "name": "batch_execute",
+        "description": "Run several independent tool calls concurrently in one request and return all of their results together",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "operations": {
+                    "type": "array",
+                    "description": "Tool calls to run",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "name": {"type": "string", "description": "Tool name"},
+                            "arguments": {"type": "object", "description": "Tool arguments"}
+                        },
+                        "required": ["name"]
                     }
                 },
-                "required": []
-            }
+                "maxConcurrent": {
+                    "type": "integer",
+                    "description": "Maximum number of operations running at once (defaults to 5)",
+                    "default": BATCH_MAX_CONCURRENT
+                },
+                "stopOnError": {
+                    "type": "boolean",
+                    "description": "Cancel the remaining operations after the first one raises",
+                    "default": False
+                }
+            },
+            "required": ["operations"]
         }
-    ]
-    
-    return tools
+    }
+]
 
-async def call_tool(name: str, arguments: Dict[str, Any]) -> List[Dict[str, Any]]:
-    """Handle AI automation tool calls"""
+# JSON Schema types accepted by the argument checks, as Python types
+_SCHEMA_TYPES = {
+    "string": str,
+    "integer": int,
+    "number": (int, float),
+    "boolean": bool,
+    "array": list,
+    "object": dict,
+}
+
+def _compile_schema(schema: Dict[str, Any]) -> Tuple[Tuple[str, ...], Dict[str, Any]]:
+    """Reduce a tool inputSchema to its required names and top-level property types"""
+    types = {
+        prop: _SCHEMA_TYPES[spec["type"]]
+        for prop, spec in schema.get("properties", {}).items()
+        if spec.get("type") in _SCHEMA_TYPES
+    }
+    return tuple(schema.get("required", ())), types
+
+# Argument checks per tool, compiled once from TOOLS
+_VALIDATORS = {tool["name"]: _compile_schema(tool["inputSchema"]) for tool in TOOLS}
+
+def _validate_arguments(name: str, arguments: Dict[str, Any]) -> Optional[str]:
+    """Check arguments against the tool's compiled schema, returning an error message or None"""
+    required, types = _VALIDATORS[name]
+    for prop in required:
+        if prop not in arguments:
+            return f"missing required argument '{prop}'"
+    for prop, value in arguments.items():
+        expected = types.get(prop)
+        if expected is None or value is None:
+            continue
+        # bool is an int subclass, so reject it explicitly for numeric fields
+        if not isinstance(value, expected) or (isinstance(value, bool) and expected is not bool):
+            return f"argument '{prop}' has the wrong type"
+    return None
+
+async def list_tools() -> List[Dict[str, Any]]:
+    """List available AI automation tools"""
+    return TOOLS
+
+def _error_content(text: str) -> List[Dict[str, Any]]:
+    """Text content for a failed tool call, flagged so callers like batch_execute can tell it from a result"""
+    return [{"type": "text", "text": text, "isError": True}]
+
+def _is_error(content: List[Dict[str, Any]]) -> bool:
+    """Whether a tool call's content reports a failure"""
+    return any(block.get("isError") for block in content)
+
+def _validate_operations(operations: Any) -> Optional[str]:
+    """Check batch_execute operations before any of them run, returning an error message or None"""
+    if not isinstance(operations, list):
+        return "operations must be a list"
+    for index, op in enumerate(operations):
+        if not isinstance(op, dict) or not isinstance(op.get("name"), str):
+            return f"operation {index} must be an object with a string 'name'"
+        if not isinstance(op.get("arguments") or {}, dict):
+            return f"operation {index} arguments must be an object"
+        if op["name"] == "batch_execute":
+            return "batch_execute cannot be nested"
+    return None
+
+def _workflow_detail_lines(result: Dict[str, Any]) -> List[str]:
+    """Shared detail lines (steps, screenshot, verification) for workflow success responses"""
+    lines = []
+    if result.get("workflow_steps"):
+        lines.append("📝 Workflow Steps:")
+        lines.extend(f"  {i}. {step}" for i, step in enumerate(result["workflow_steps"], 1))
+    if result.get("screenshot"):
+        lines.append(f"📸 Screenshot: Captured successfully (length: {len(result['screenshot'])} chars)")
+    if result.get("screenshot_file_path"):
+        lines.append(f"🖼️ Screenshot File: {result['screenshot_file_path']}")
+    if result.get("database_verification"):
+        lines.append(f"💾 Database Verification: {result['database_verification']}")
+    if result.get("verification_file_path"):
+        lines.append(f"📄 Verification File: {result['verification_file_path']}")
+    return lines
+
+async def _capture_screenshot(page, url: str, wait_for: Optional[str]) -> str:
+    """Navigate a page to the URL, wait for the optional selector and return a base64 screenshot"""
+    # An explicit selector is a better readiness signal than network idle
+    await page.goto(url, wait_until="domcontentloaded" if wait_for else "load")
+    if wait_for:
+        await page.wait_for_selector(wait_for, timeout=5000)
+    return await _automation_service.take_screenshot(page)
+
+async def _iter_batch(operations: List[Dict[str, Any]], max_concurrent: int, stop_on_error: bool) -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
+    """Run tool calls concurrently under a semaphore, yielding (index, result) as each one finishes"""
+    semaphore = asyncio.Semaphore(max(1, max_concurrent))
+
+    async def run(index: int, op: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        async with semaphore:
+            try:
+                outcome = await call_tool(op["name"], op.get("arguments") or {})
+            except Exception as e:
+                return index, {"name": op["name"], "success": False, "error": str(e)}
+        text = "\n".join(content.get("text", "") for content in outcome if content.get("type") == "text")
+        if _is_error(outcome):
+            return index, {"name": op["name"], "success": False, "error": text}
+        return index, {"name": op["name"], "success": True, "text": text}
+
+    tasks = [asyncio.create_task(run(index, op)) for index, op in enumerate(operations)]
+    reported = set()
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            index, result = await next_done
+            reported.add(index)
+            yield index, result
+            if stop_on_error and not result["success"]:
+                for other_index, task in enumerate(tasks):
+                    if other_index in reported:
+                        continue
+                    name = operations[other_index]["name"]
+                    if not task.done() or task.cancelled():
+                        task.cancel()
+                        yield other_index, {"name": name, "success": False, "error": "Cancelled after an earlier operation failed"}
+                    elif task.exception() is not None:
+                        yield other_index, {"name": name, "success": False, "error": str(task.exception())}
+                    else:
+                        # Finished before the failure was seen but not yet yielded by as_completed
+                        yield task.result()
+                return
+    finally:
+        # Covers early exit and a consumer that stops iterating; no-op for finished tasks
+        for task in tasks:
+            task.cancel()
+
+async def _batch_execute(operations: List[Dict[str, Any]], max_concurrent: int, stop_on_error: bool) -> List[Dict[str, Any]]:
+    """Run tool calls concurrently and collect one result per operation, in request order"""
+    results: List[Optional[Dict[str, Any]]] = [None] * len(operations)
+    async for index, result in _iter_batch(operations, max_concurrent, stop_on_error):
+        results[index] = result
+    return results
+
+async def _handle_ai_browser_automation(arguments: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Run a natural language command through the automation service"""
+    if not _automation_service:
+        return _error_content("Error: AI automation service not available")
     
-    # AI Browser Automation Tools - Direct service calls
-    if name == "ai_browser_automation":
-        if not _automation_service:
-            return [{"type": "text", "text": "Error: AI automation service not available"}]
+    try:
+        command = arguments.get("command", "")
+        base_url = arguments.get("base_url", "http://localhost:3000")
         
-        try:
-            command = arguments.get("command", "")
-            base_url = arguments.get("base_url", "http://localhost:3000")
-            
-            # Call the automation service directly (no HTTP routing)
-            result = await _automation_service.process_natural_language_command(command, base_url)
+        # Call the automation service directly (no HTTP routing)
+        result = await _automation_service.process_natural_language_command(command, base_url)
+        
+        # Format the result for MCP response
+        if result.get("success"):
+            response_text = f"✅ {result.get('message', 'Command executed successfully')}"
+            if result.get("screenshot"):
+                response_text += f"\n📸 Screenshot captured"
+            if result.get("workflow_steps"):
+                response_text += f"\n📋 Steps: {', '.join(result['workflow_steps'])}"
+            return [{"type": "text", "text": response_text}]
+        else:
+            error_text = f"❌ {result.get('message', 'Command failed')}"
+            if result.get("error"):
+                error_text += f"\n🔍 Details: {result['error']}"
+            return _error_content(error_text)
             
-            # Format the result for MCP response
-            if result.get("success"):
-                response_text = f"✅ {result.get('message', 'Command executed successfully')}"
-                if result.get("screenshot"):
-                    response_text += f"\n📸 Screenshot captured"
-                if result.get("workflow_steps"):
-                    response_text += f"\n📋 Steps: {', '.join(result['workflow_steps'])}"
-                return [{"type": "text", "text": response_text}]
-            else:
-                error_text = f"❌ {result.get('message', 'Command failed')}"
-                if result.get("error"):
-                    error_text += f"\n🔍 Details: {result['error']}"
-                return [{"type": "text", "text": error_text}]
-                
-        except Exception as e:
-            return [{"type": "text", "text": f"Error executing AI automation: {str(e)}"}]
+    except Exception as e:
+        return _error_content(f"Error executing AI automation: {str(e)}")
+
+async def _handle_mhmd_toggle_workflow(arguments: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Run the MHMD preference toggle workflow and report every detail"""
+    logger.debug("MHMD workflow called with arguments: %s", arguments)
+    
+    if not _automation_service:
+        logger.debug("Automation service not available")
+        return _error_content("Error: AI automation service not available")
     
-    elif name == "mhmd_toggle_workflow":
-        print(f"DEBUG: MHMD workflow called with arguments: {arguments}")
+    try:
+        # Extract parameters from arguments
+        name_param = arguments.get("name")
+        email = arguments.get("email")
+        preference_str = arguments.get("preference")
+        base_url = arguments.get("base_url", "http://localhost:3000")
         
-        if not _automation_service:
-            print("DEBUG: Automation service not available")
-            return [{"type": "text", "text": "Error: AI automation service not available"}]
+        # Create workflow input
+        preference = _PREF_LOOKUP.get(preference_str) if preference_str else None
+        if preference_str and preference is None:
+            return _error_content(f"Error: Unknown MHMD preference {preference_str}")
+        workflow_input = MHMDWorkflowInput(name=name_param, email=email, preference=preference)
         
-        print(f"DEBUG: Automation service available: {type(_automation_service)}")
+        logger.debug("Calling execute_mhmd_toggle_workflow with input: %s (base URL: %s)", workflow_input, base_url)
         
-        try:
-            from models import MHMDWorkflowInput, MHMDPreference
-            
-            # Extract parameters from arguments
-            name_param = arguments.get("name")
-            email = arguments.get("email")
-            preference_str = arguments.get("preference")
-            base_url = arguments.get("base_url", "http://localhost:3000")
-            
-            print(f"DEBUG: Creating workflow input with name={name_param}, email={email}, preference={preference_str}, base_url={base_url}")
-            
-            # Create workflow input
-            preference = MHMDPreference(preference_str) if preference_str else None
-            workflow_input = MHMDWorkflowInput(name=name_param, email=email, preference=preference)
-            
-            print(f"DEBUG: About to call execute_mhmd_toggle_workflow with input: {workflow_input}")
-            
-            # Call the automation service directly (no HTTP routing)
-            result = await _automation_service.execute_mhmd_toggle_workflow(workflow_input, base_url)
-            
-            # Debug: Log the full result to see what we're getting
-            print(f"DEBUG: MHMD workflow result: {result}")
-            print(f"DEBUG: Result type: {type(result)}")
-            print(f"DEBUG: Result keys: {result.keys() if isinstance(result, dict) else 'Not a dict'}")
+        # Call the automation service directly (no HTTP routing)
+        result = await _automation_service.execute_mhmd_toggle_workflow(workflow_input, base_url)
+        
+        # Log the result shape only; the inline screenshot can be hundreds of KB
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "MHMD workflow result keys: %s (screenshot length: %d)",
+                list(result.keys()), len(result.get("screenshot") or "")
+            )
+        
+        # Format the result for MCP response - preserve ALL details
+        if result.get("success"):
+            lines = [
+                "✅ MHMD Workflow Completed Successfully!",
+                f"📋 Message: {result.get('message', 'Workflow executed')}"
+            ]
+            if result.get("final_preference"):
+                lines.append(f"🎯 Final MHMD Preference: {result['final_preference']}")
+            lines.extend(_workflow_detail_lines(result))
+            return [{"type": "text", "text": "\n".join(lines)}]
+        else:
+            error_text = f"❌ MHMD workflow failed: {result.get('message', 'Unknown error')}"
+            if result.get("error"):
+                error_text += f"\n🔍 Error Details: {result['error']}"
+            logger.debug("MHMD workflow error response: %s", error_text)
+            return _error_content(error_text)
             
-            # Format the result for MCP response - preserve ALL details
-            if result.get("success"):
-                response_text = f"✅ MHMD Workflow Completed Successfully!\n"
-                response_text += f"📋 Message: {result.get('message', 'Workflow executed')}\n"
-                
-                if result.get("final_preference"):
-                    response_text += f"🎯 Final MHMD Preference: {result['final_preference']}\n"
-                
-                if result.get("workflow_steps"):
-                    response_text += f"📝 Workflow Steps:\n"
-                    for i, step in enumerate(result['workflow_steps'], 1):
-                        response_text += f"  {i}. {step}\n"
-                
-                if result.get("screenshot"):
-                    response_text += f"📸 Screenshot: Captured successfully (length: {len(result['screenshot'])} chars)\n"
-                
-                if result.get("screenshot_file_path"):
-                    response_text += f"🖼️ Screenshot File: {result['screenshot_file_path']}\n"
-                
-                if result.get("database_verification"):
-                    response_text += f"💾 Database Verification: {result['database_verification']}\n"
-                
-                if result.get("verification_file_path"):
-                    response_text += f"📄 Verification File: {result['verification_file_path']}\n"
-                
-                print(f"DEBUG: Final response_text: {response_text}")
-                return [{"type": "text", "text": response_text.strip()}]
-            else:
-                error_text = f"❌ MHMD workflow failed: {result.get('message', 'Unknown error')}"
-                if result.get("error"):
-                    error_text += f"\n🔍 Error Details: {result['error']}"
-                print(f"DEBUG: Error response: {error_text}")
-                return [{"type": "text", "text": error_text}]
-                
-        except Exception as e:
-            error_msg = f"Error executing MHMD workflow: {str(e)}"
-            print(f"DEBUG: Exception occurred: {error_msg}")
-            import traceback
-            print(f"DEBUG: Traceback: {traceback.format_exc()}")
-            return [{"type": "text", "text": error_msg}]
+    except Exception as e:
+        error_msg = f"Error executing MHMD workflow: {str(e)}"
+        logger.error("MHMD workflow raised: %s", e, exc_info=True)
+        return _error_content(error_msg)
+
+async def _handle_take_screenshot(arguments: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Navigate to a URL and capture a screenshot"""
+    if not _automation_service:
+        return _error_content("Error: AI automation service not available")
     
-    elif name == "take_screenshot":
-        if not _automation_service:
-            return [{"type": "text", "text": "Error: AI automation service not available"}]
+    try:
+        url = arguments.get("url")
+        wait_for = arguments.get("wait_for")
         
-        try:
-            url = arguments.get("url")
-            wait_for = arguments.get("wait_for")
-            
-            if not _automation_service.browser:
-                return [{"type": "text", "text": "Error: Browser not initialized"}]
-            
-            page = await _automation_service.browser.new_page()
+        if not _automation_service.browser:
+            return _error_content("Error: Browser not initialized")
+        
+        if os.path.exists(STORAGE_STATE_PATH):
+            # Seeded with the saved storage state, so it can't come from the shared pool
+            context = await _automation_service.browser.new_context(
+                viewport={"width": 1280, "height": 720},
+                storage_state=STORAGE_STATE_PATH
+            )
             try:
-                await page.goto(url, wait_until="networkidle")
-                
-                if wait_for:
-                    await page.wait_for_selector(wait_for, timeout=5000)
-                
-                screenshot_b64 = await _automation_service.take_screenshot(page)
-                
-                return [{"type": "text", "text": f"✅ Screenshot captured from {url}\n📸 Base64 length: {len(screenshot_b64)} chars"}]
-                
+                screenshot_b64 = await _capture_screenshot(await context.new_page(), url, wait_for)
             finally:
-                await page.close()
-                
-        except Exception as e:
-            return [{"type": "text", "text": f"Error taking screenshot: {str(e)}"}]
-    
-    elif name == "swagger_api_test_workflow":
-        if not _automation_service:
-            return [{"type": "text", "text": "Error: AI automation service not available"}]
+                await context.close()
+        else:
+            # Warm page and context from the service pool, replaced with a fresh context on release
+            async with _automation_service.pooled_page() as page:
+                screenshot_b64 = await _capture_screenshot(page, url, wait_for)
         
-        try:
-            base_url = arguments.get("base_url", "http://localhost:8000")
+        return [{"type": "text", "text": f"✅ Screenshot captured from {url}\n📸 Base64 length: {len(screenshot_b64)} chars"}]
             
-            # Call the automation service directly
-            result = await _automation_service.execute_swagger_api_test_workflow(base_url)
+    except Exception as e:
+        return _error_content(f"Error taking screenshot: {str(e)}")
+
+async def _handle_swagger_api_test_workflow(arguments: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Run the Swagger UI API test workflow"""
+    if not _automation_service:
+        return _error_content("Error: AI automation service not available")
+    
+    try:
+        base_url = arguments.get("base_url", "http://localhost:8000")
+        
+        # Call the automation service directly
+        result = await _automation_service.execute_swagger_api_test_workflow(base_url)
+        
+        # Format the result for MCP response
+        if result.get("success"):
+            lines = [
+                "✅ Swagger API Test Workflow Completed Successfully!",
+                f"📋 Message: {result.get('message', 'Workflow executed')}"
+            ]
+            if result.get("test_user_data"):
+                user_data = result["test_user_data"]["data"]
+                lines.append(f"👤 Test User Created: {user_data['name']} ({user_data['email']}) with {user_data['mhmd_preference']} preference")
+            if result.get("api_response_status"):
+                lines.append(f"📊 API Response Status: {result['api_response_status']}")
+            lines.extend(_workflow_detail_lines(result))
+            return [{"type": "text", "text": "\n".join(lines)}]
+        else:
+            error_text = f"❌ Swagger API test workflow failed: {result.get('message', 'Unknown error')}"
+            if result.get("error"):
+                error_text += f"\n🔍 Error Details: {result['error']}"
+            return _error_content(error_text)
             
-            # Format the result for MCP response
-            if result.get("success"):
-                response_text = f"✅ Swagger API Test Workflow Completed Successfully!\n"
-                response_text += f"📋 Message: {result.get('message', 'Workflow executed')}\n"
-                
-                if result.get("test_user_data"):
-                    user_data = result["test_user_data"]["data"]
-                    response_text += f"👤 Test User Created: {user_data['name']} ({user_data['email']}) with {user_data['mhmd_preference']} preference\n"
-                
-                if result.get("api_response_status"):
-                    response_text += f"📊 API Response Status: {result['api_response_status']}\n"
-                
-                if result.get("workflow_steps"):
-                    response_text += f"📝 Workflow Steps:\n"
-                    for i, step in enumerate(result['workflow_steps'], 1):
-                        response_text += f"  {i}. {step}\n"
-                
-                if result.get("screenshot"):
-                    response_text += f"📸 Screenshot: Captured successfully (length: {len(result['screenshot'])} chars)\n"
-                
-                if result.get("screenshot_file_path"):
-                    response_text += f"🖼️ Screenshot File: {result['screenshot_file_path']}\n"
-                
-                if result.get("database_verification"):
-                    response_text += f"💾 Database Verification: {result['database_verification']}\n"
-                
-                if result.get("verification_file_path"):
-                    response_text += f"📄 Verification File: {result['verification_file_path']}\n"
-                
-                return [{"type": "text", "text": response_text.strip()}]
-            else:
-                error_text = f"❌ Swagger API test workflow failed: {result.get('message', 'Unknown error')}"
-                if result.get("error"):
-                    error_text += f"\n🔍 Error Details: {result['error']}"
-                return [{"type": "text", "text": error_text}]
-                
-        except Exception as e:
-            return [{"type": "text", "text": f"Error executing Swagger API test workflow: {str(e)}"}]
+    except Exception as e:
+        return _error_content(f"Error executing Swagger API test workflow: {str(e)}")
+
+async def _handle_batch_execute(arguments: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Run several tool calls concurrently and return their results together"""
+    operations = arguments.get("operations") or []
+    error = _validate_operations(operations)
+    if error:
+        return _error_content(f"Error: Invalid batch_execute operations: {error}")
     
-    else:
-        return [{"type": "text", "text": f"Error: Unknown tool {name}"}]
+    results = await _batch_execute(
+        operations,
+        arguments.get("maxConcurrent", BATCH_MAX_CONCURRENT),
+        arguments.get("stopOnError", False)
+    )
+    return [{"type": "text", "text": json.dumps(results, ensure_ascii=False)}]
+
+# Tool name -> handler, so dispatch is a single dict lookup
+_DISPATCH: Dict[str, Callable[[Dict[str, Any]], Awaitable[List[Dict[str, Any]]]]] = {
+    "ai_browser_automation": _handle_ai_browser_automation,
+    "mhmd_toggle_workflow": _handle_mhmd_toggle_workflow,
+    "take_screenshot": _handle_take_screenshot,
+    "swagger_api_test_workflow": _handle_swagger_api_test_workflow,
+    "batch_execute": _handle_batch_execute,
+}
+
+async def call_tool(name: str, arguments: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Handle AI automation tool calls"""
+    handler = _DISPATCH.get(name)
+    if not handler:
+        return _error_content(f"Error: Unknown tool {name}")
+    error = _validate_arguments(name, arguments)
+    if error:
+        return _error_content(f"Error: Invalid arguments for {name}: {error}")
+    return await handler(arguments)
+
+async def stream_tool_results(name: str, arguments: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+    """Yield tool output incrementally: each batch_execute operation as it finishes, otherwise the content blocks"""
+    operations = arguments.get("operations") or []
+    if name == "batch_execute" and _validate_arguments(name, arguments) is None and _validate_operations(operations) is None:
+        async for index, result in _iter_batch(
+            operations,
+            arguments.get("maxConcurrent", BATCH_MAX_CONCURRENT),
+            arguments.get("stopOnError", False)
+        ):
+            yield {"type": "batch_result", "index": index, **result}
+        return
+
+    for content in await call_tool(name, arguments):
+        yield content
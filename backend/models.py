@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr
-from typing import Literal, List, Optional
+from typing import Dict, Literal, List, Optional
 from enum import Enum
 
 class MHMDPreference(str, Enum):
@@ -29,6 +29,15 @@ class MHMDWorkflowInput(BaseModel):
     email: Optional[str] = None
     preference: Optional[MHMDPreference] = None
 
+class ParsedCommand(BaseModel):
+    workflow_type: Literal["mhmd_only", "swagger_only", "combined"] = "mhmd_only"
+    name: Optional[str] = None
+    email: Optional[str] = None
+    preference: Optional[MHMDPreference] = None
+
+class ParsedCommandBatch(BaseModel):
+    commands: List[ParsedCommand]
+
 class AICommandResponse(BaseModel):
     success: bool
     message: str
@@ -44,5 +53,5 @@ class MCPCallRequest(BaseModel):
 
 class MCPResponse(BaseModel):
     success: bool
-    data: Optional[List[dict]] = None
+    data: Optional[List[Dict[str, str]]] = None
     error: Optional[str] = None
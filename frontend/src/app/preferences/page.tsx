@@ -102,8 +102,8 @@ export default function PreferencesPage() {
 
           {/* Messages */}
           {message && (
-            <div className="mb-6 p-4 bg-green-50 border border-green-200 rounded-md">
-              <p className="text-green-800">{message}</p>
+            <div data-testid="mhmd-success-banner" className="mb-6 p-4 bg-green-50 border border-green-200 rounded-md">
+              <p data-testid="mhmd-success-text" className="text-green-800">{message}</p>
             </div>
           )}
           
@@ -276,7 +276,7 @@ export default function AIAutomation() {
               <h4 className="font-semibold text-gray-900 mb-2">Screenshot:</h4>
               <div className="border border-gray-200 rounded-md overflow-hidden">
                 <img
-                  src={`data:image/png;base64,${result.screenshot}`}
+                  src={`data:image/jpeg;base64,${result.screenshot}`}
                   alt="Automation Screenshot"
                   className="w-full h-auto"
                 />
@@ -297,7 +297,7 @@ export default function AIAutomation() {
                       </h5>
                     </div>
                     <img
-                      src={`data:image/png;base64,${screenshot.screenshot}`}
+                      src={`data:image/jpeg;base64,${screenshot.screenshot}`}
                       alt={screenshot.description || `Screenshot ${index + 1}`}
                       className="w-full h-auto"
                     />